@@ -0,0 +1,400 @@
+"""Headless benchmarks for the dashboard's data pipeline.
+
+Writes synthetic Cycle and Comparison workbooks with the same sheet names and
+header layout as the real files, then times each stage outside Streamlit and
+prints wall time, peak memory and rows/s as JSON.  Every stage runs in a
+fresh process, and peak memory is traced with tracemalloc around the timed
+call only (in a separate run, so tracing doesn't slow the timed runs).  It
+counts Python and NumPy/pandas allocations made by the stage itself, not
+its setup or memory held by pyarrow.  Native allocations (lxml, openpyxl,
+pyarrow) show up in the peak RSS growth over the post-setup high-water mark,
+reported next to it where the ``resource`` module exists (not on Windows).
+Output of the stages goes to stderr, so stdout is only the JSON report.
+
+Usage:
+    python benchmark.py --districts 200 --projects 12 --rows 40 --cycles 6
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import dashboard_data
+import dpm_sheet
+import read_excel_files
+import sheet_cache
+import type_inference
+import workbook_loader
+
+CYCLE_SHEET = "Cycle 1"
+STATE_SHEET = "Cycle 1 State DPM wise status"
+COMPARISON_SHEET = "Comparison Graph"
+
+# (group, [labels]) of the state-wide table after the DPM/PO/District columns
+STATE_GROUPS = [
+    ("Central Workshop", ["Total no. of DPOs/ DWCDOs", "Attended Central Workshop",
+                          "% DPOs/ DWCDOs attended central workshop", "Practiced in lab",
+                          "% Practiced in lab", "Conducted CDPO training",
+                          "% Conducted CDPO training"]),
+    ("CDPO Level", ["Total", "No. of CDPOs Attended workshop", "% of CDPOs Attended workshop",
+                    "No. of CDPOs Practiced in lab", "% of CDPOs Practiced in lab",
+                    "No. of CDPOs Conducted Supervisor Training",
+                    "% of CDPOs Conducted Supervisor Training"]),
+    ("LS level", ["Total", "No. of LS attended workshop", "% of LS attended workshop",
+                  "No. of LS practiced in Lab", "% of LS practiced in Lab",
+                  "No. of LS conducted AWW workshop", "% of LS conducted AWW workshop"]),
+    ("AWW Level", ["Total", "No. of AWWs received training", "% of AWWs received training"]),
+]
+CYCLE_GROUPS = [
+    ("DPO/DWCDO Workshop", ["Total", "Attended Workshop", "Lab practice", "Conducted CDPO Trng"]),
+    ("CDPO Implementation", ["Total CDPO", "Attended Workshop", "Lab practice", "Conducted LS Trng"]),
+    ("LS Implementation", ["Total", "Attended Workshop", "Lab practice", "Conducted AWW Trng"]),
+    ("AWW Workshop", ["Total", "Complete", None]),
+]
+QUESTIONS = [
+    "% DPOs/ DWCDOs Attended Central Workshop", "% DPO/DWCDO Practiced in lab",
+    "% DPO/ DWCDO Conducted CDPO Training", "% CDPOs Attended Training",
+    "% CDPOs Practiced in lab", "% CDPOs Conducted Supervisor Training",
+    "%  LS Attended Workshop", "% LS Practiced in Lab", "% LS conducted AWW Workshop",
+    "% AWWs received Training",
+]
+DPMS_PER_STATE = 4
+
+
+def _state_row(rng, serial, dpm, po, district):
+    """One district row of the state-wide table: a total, then count/% pairs"""
+    row = [serial, dpm, po, district]
+    for group, labels in STATE_GROUPS:
+        total = rng.randint(1, 2 if group == "Central Workshop" else 100)
+        row.append(total)
+        for label in labels[1:]:
+            if label.startswith("%"):
+                row.append(round(row[-1] / total * 100, 1) if total else 0)
+            else:
+                row.append(rng.randint(0, total))
+    return row
+
+
+def write_cycle_workbook(path, districts, projects, rows, seed=0):
+    """Write a synthetic Cycle 1 workbook with the real sheet names and header layout.
+
+    ``districts`` sets the rows of the Cycle 1 and state-wide tables;
+    ``projects`` x ``rows`` AWC rows per district go into the hierarchy sheet.
+    """
+    import random
+
+    import openpyxl
+
+    rng = random.Random(seed)
+    names = [f"District {i + 1}" for i in range(districts)]
+    workbook = openpyxl.Workbook(write_only=True)
+
+    sheet = workbook.create_sheet(CYCLE_SHEET)
+    sheet.append(["CG LNC Implementation Status - Cycle 1"])
+    group_row, label_row = [None, "Name of District"], [None, None]
+    for group, labels in CYCLE_GROUPS:
+        group_row += [group] + [None] * (len(labels) - 1)
+        label_row += labels
+    sheet.append(group_row)
+    sheet.append(label_row)
+    for i, name in enumerate(names):
+        values = []
+        for _, labels in CYCLE_GROUPS:
+            total = rng.randint(1, 2000)
+            values += [total] + [rng.randint(0, total) for _ in labels[1:]]
+        sheet.append([i + 1, name] + values)
+
+    sheet = workbook.create_sheet(STATE_SHEET)
+    sheet.append(["CG State wide Implementation table"])
+    group_row, label_row = [None] * 4, [None, "DPM", "PO", "District"]
+    for group, labels in STATE_GROUPS:
+        group_row += [group] + [None] * (len(labels) - 1)
+        label_row += labels
+    state_rows = [_state_row(rng, i + 1, f"DPM {i % DPMS_PER_STATE + 1}", f"PO {i % 9 + 1}", name)
+                  for i, name in enumerate(names)]
+    sheet.append(group_row)
+    sheet.append(label_row)
+    for row in state_rows:
+        sheet.append(row)
+    totals = [sum(row[i] for row in state_rows) for i in range(4, len(label_row))]
+    sheet.append([None, "Total", DPMS_PER_STATE, districts] + totals)
+    # DPM-wise blocks repeat the districts of each DPM under the same header
+    for dpm in range(DPMS_PER_STATE):
+        sheet.append([])
+        sheet.append([f"DPM wise implementation report {dpm + 1}"])
+        sheet.append(group_row)
+        sheet.append(label_row)
+        for row in state_rows[dpm::DPMS_PER_STATE]:
+            sheet.append(row)
+
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([None, "D", "P", "S", "A"])
+    for name in names:
+        for project in range(projects):
+            for awc in range(rows):
+                sheet.append(["FCL", name, f"Project {project + 1}",
+                              f"Sector {awc // 3 + 1}", f"AWC {awc % 3 + 1}"])
+
+    workbook.save(path)
+
+
+def write_comparison_workbook(path, cycles, seed=0):
+    """Write a synthetic Comparison Graph workbook with ``cycles`` cycle columns"""
+    import datetime
+    import random
+
+    import openpyxl
+
+    rng = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(COMPARISON_SHEET)
+    sheet.append(["Questions"] + [f"Cycle {i + 1}" for i in range(cycles)])
+    sheet.append([None, "End of Cycle 1"] +
+                 [datetime.datetime(2024, 1, 1) + datetime.timedelta(days=30 * i) for i in range(1, cycles)])
+    for question in QUESTIONS:
+        sheet.append([question] + [round(rng.uniform(0, 100), 1) for _ in range(cycles)])
+    workbook.save(path)
+
+
+def _rows(sheets):
+    return sum(len(df) for df in sheets.values())
+
+
+def _stage_load_cold(paths, streaming):
+    sheets = workbook_loader.load_sheets(paths['cycle1'], 'bench-cold', [CYCLE_SHEET, STATE_SHEET],
+                                         streaming=streaming)
+    sheets.update(workbook_loader.load_sheets(paths['comparison'], 'bench-cold-cmp', [COMPARISON_SHEET],
+                                              streaming=streaming))
+    return _rows(sheets)
+
+
+def _stage_load_concurrent(paths, streaming, _):
+    import parallel_loader
+
+    loader = parallel_loader.SheetLoader()
+    loads = loader.workbook(paths['cycle1'], 'bench-concurrent', [CYCLE_SHEET, STATE_SHEET], streaming=streaming)
+    loads.update(loader.workbook(paths['comparison'], 'bench-concurrent-cmp', [COMPARISON_SHEET],
+                                 streaming=streaming))
+    rows = sum(len(loads[name].result()) for name in (CYCLE_SHEET, STATE_SHEET, COMPARISON_SHEET))
+    loader.shutdown()
+    return rows
+
+
+def _setup_load_warm(paths, streaming):
+    _stage_load_cold(paths, streaming)
+
+
+def _stage_load_warm(paths, streaming, _):
+    return _stage_load_cold(paths, streaming)
+
+
+def _setup_convert(paths, streaming):
+    return workbook_loader.read_workbook(paths['cycle1'], [CYCLE_SHEET, STATE_SHEET], dtype=str,
+                                         streaming=streaming)
+
+
+def _stage_convert(paths, streaming, raw_sheets):
+    for df in raw_sheets.values():
+        type_inference.convert_types(df)
+    return _rows(raw_sheets)
+
+
+def _setup_clean(paths, streaming):
+    return workbook_loader.load_sheets(paths['comparison'], 'bench-clean', [COMPARISON_SHEET],
+                                       streaming=streaming)[COMPARISON_SHEET]
+
+
+def _stage_clean(paths, streaming, comparison_df):
+    return len(dashboard_data.clean_comparison(comparison_df))
+
+
+def _setup_districts(paths, streaming):
+    return workbook_loader.read_workbook(paths['cycle1'], [STATE_SHEET], dtype=str,
+                                         streaming=streaming)[STATE_SHEET]
+
+
+def _stage_districts(paths, streaming, raw):
+    districts, totals = dpm_sheet.extract_district_metrics(raw)
+    dpm_sheet.DistrictIndex(districts, totals)
+    return len(raw)
+
+
+def _setup_district_figure(paths, streaming):
+    districts, totals = dpm_sheet.extract_district_metrics(_setup_districts(paths, streaming))
+    return dpm_sheet.DistrictIndex(districts, totals)
+
+
+def _stage_district_figure(paths, streaming, index):
+    import dashboard_figures
+
+    plot_data = index.long(index.percent_metrics[:2])
+    dashboard_figures.district_bar(plot_data).to_json()
+    return len(plot_data)
+
+
+def _stage_read_excel_file(paths, streaming, _):
+    return read_excel_files.read_excel_file(paths['cycle1'], paths['output_dir'], streaming=streaming)[0]
+
+
+# name -> (setup, timed stage); setup runs in the same process but isn't timed
+STAGES = {
+    'load_data_cold': (None, lambda paths, streaming, _: _stage_load_cold(paths, streaming)),
+    'load_data_warm': (_setup_load_warm, _stage_load_warm),
+    'load_data_concurrent': (None, _stage_load_concurrent),
+    'convert_types': (_setup_convert, _stage_convert),
+    'clean_comparison': (_setup_clean, _stage_clean),
+    'district_extraction': (_setup_districts, _stage_districts),
+    'district_figure': (_setup_district_figure, _stage_district_figure),
+    'read_excel_file': (None, _stage_read_excel_file),
+}
+
+
+def _max_rss_bytes():
+    """High-water mark of this process's resident memory, or None without the resource module"""
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def _run_stage(name, paths, streaming, trace_memory=False):
+    """Child process body: run one stage against a private sheet cache.
+
+    With ``trace_memory`` the stage's peak allocation (above what setup left
+    behind) is traced instead of its wall time being meaningful.
+    """
+    sheet_cache.CACHE_DIR = tempfile.mkdtemp(prefix="lnc-bench-cache-")
+    try:
+        # Stages such as read_excel_file print progress; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            setup, stage = STAGES[name]
+            state = setup(paths, streaming) if setup else None
+            rss_before = _max_rss_bytes()
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            rows = stage(paths, streaming, state)
+            wall = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        rss_growth = None if rss_before is None else _max_rss_bytes() - rss_before
+        return {'wall_s': wall, 'rows': rows, 'peak_bytes': peak, 'rss_growth_bytes': rss_growth}
+    finally:
+        shutil.rmtree(sheet_cache.CACHE_DIR, ignore_errors=True)
+
+
+def run_benchmarks(districts, projects, rows, cycles, repeat=3, stages=None, streaming=False):
+    """Generate workbooks, time every stage ``repeat`` times and return the report"""
+    workdir = tempfile.mkdtemp(prefix="lnc-bench-")
+    try:
+        paths = {
+            'cycle1': os.path.join(workdir, "Cycle 1 LNC Implementation Analysis.xlsx"),
+            'comparison': os.path.join(workdir, "LNC Implementation Comparison Graph.xlsx"),
+            'output_dir': os.path.join(workdir, "output"),
+        }
+        os.makedirs(paths['output_dir'])
+        write_cycle_workbook(paths['cycle1'], districts, projects, rows)
+        write_comparison_workbook(paths['comparison'], cycles)
+
+        results = {}
+        # A fresh process per run keeps each stage's memory separate from the others
+        context = multiprocessing.get_context('spawn')
+        for name in stages or STAGES:
+            runs = []
+            for _ in range(repeat):
+                with context.Pool(1) as pool:
+                    runs.append(pool.apply(_run_stage, (name, paths, streaming)))
+            # One extra traced run for memory; tracemalloc would skew the timings
+            with context.Pool(1) as pool:
+                traced = pool.apply(_run_stage, (name, paths, streaming, True))
+            walls = [run['wall_s'] for run in runs]
+            median_wall = statistics.median(walls)
+            # RSS from the untraced runs, since tracemalloc's own bookkeeping adds to it
+            rss_growth = [run['rss_growth_bytes'] for run in runs if run['rss_growth_bytes'] is not None]
+            results[name] = {
+                'wall_s_median': round(median_wall, 4),
+                'wall_s_min': round(min(walls), 4),
+                'rows': runs[0]['rows'],
+                'rows_per_s': round(runs[0]['rows'] / median_wall, 1) if median_wall else None,
+                'peak_mem_mb': round(traced['peak_bytes'] / (1024 * 1024), 1),
+                'peak_rss_growth_mb': round(max(rss_growth) / (1024 * 1024), 1) if rss_growth else None,
+            }
+
+        return {
+            'config': {'districts': districts, 'projects': projects, 'rows': rows, 'cycles': cycles,
+                       'repeat': repeat, 'streaming': streaming},
+            'workbook_bytes': {'cycle1': os.path.getsize(paths['cycle1']),
+                               'comparison': os.path.getsize(paths['comparison'])},
+            'python': platform.python_version(),
+            'stages': results,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Return the stages whose median wall time regressed by more than ``tolerance``"""
+    regressions = []
+    for name, result in report['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if not previous or not previous.get('wall_s_median'):
+            continue
+        ratio = result['wall_s_median'] / previous['wall_s_median']
+        if ratio > 1 + tolerance:
+            regressions.append({'stage': name, 'baseline_s': previous['wall_s_median'],
+                                'current_s': result['wall_s_median'], 'ratio': round(ratio, 2)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LNC dashboard data pipeline")
+    parser.add_argument("--districts", type=int, default=28, help="Districts per state (default: %(default)s)")
+    parser.add_argument("--projects", type=int, default=10, help="Projects per district (default: %(default)s)")
+    parser.add_argument("--rows", type=int, default=30,
+                        help="AWC rows per project in the hierarchy sheet (default: %(default)s)")
+    parser.add_argument("--cycles", type=int, default=4, help="Cycles in the comparison sheet (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (default: %(default)s)")
+    parser.add_argument("--stage", action="append", choices=list(STAGES),
+                        help="Only run this stage (repeatable)")
+    parser.add_argument("--streaming", action="store_true", help="Use the read-only streaming reader")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline (default: %(default)s = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.districts, args.projects, args.rows, args.cycles,
+                            repeat=args.repeat, stages=args.stage, streaming=args.streaming)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = compare_to_baseline(report, json.load(f), args.tolerance)
+        exit_code = 1 if report['regressions'] else 0
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
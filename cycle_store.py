@@ -0,0 +1,240 @@
+"""Persistent multi-cycle store behind the "Comparison Across Cycles" tab.
+
+Each ingest reads one Cycle-style workbook, extracts the district-level
+percentage metrics from its "State DPM wise status" sheet and appends them
+in long format (question, district, cycle, value) to a SQLite database.  The
+state-level value of every question is computed for that cycle only at
+ingest time, so the comparison table is a query over small summary rows
+instead of a re-read of every historical workbook.
+
+Usage:
+    python cycle_store.py ingest "Cycle 2 LNC Implementation Analysis.xlsx" [--cycle "Cycle 2"]
+    python cycle_store.py show
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+import dpm_sheet
+import output_backends
+import sheet_cache
+import workbook_loader
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "LNC_CYCLE_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lnc_cycles.sqlite")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cycles (
+    cycle TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    source_file TEXT,
+    sha256 TEXT,
+    ingested_at REAL
+);
+CREATE TABLE IF NOT EXISTS district_values (
+    question TEXT NOT NULL,
+    district TEXT NOT NULL,
+    cycle TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (question, district, cycle)
+);
+CREATE TABLE IF NOT EXISTS cycle_summary (
+    question TEXT NOT NULL,
+    cycle TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (question, cycle)
+);
+"""
+
+
+class CycleExists(ValueError):
+    """A cycle is already in the store from a different workbook"""
+
+
+def cycle_sort_key(cycle, position):
+    """Order cycles by the number in their label ('Cycle 2.1' -> (2, 1)), then by ingest position.
+
+    Cycles ingested out of order (backfilled history) still line up
+    chronologically; labels without a number follow in ingest order.
+    """
+    match = re.search(r'(\d+(?:\.\d+)*)', cycle)
+    if match is None:
+        return (1, (), position)
+    return (0, tuple(int(part) for part in match.group(1).split('.')), position)
+
+
+def ordered_cycles(connection):
+    """Cycle labels of the store in chronological order"""
+    rows = connection.execute("SELECT cycle, position FROM cycles").fetchall()
+    return [cycle for cycle, position in sorted(rows, key=lambda row: cycle_sort_key(*row))]
+
+
+def connect(path=None):
+    """Open the store, creating its tables on first use"""
+    connection = sqlite3.connect(path or DEFAULT_STORE_PATH)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def ingest(workbook_path, cycle=None, path=None, force=False):
+    """Add one cycle's workbook to the store.
+
+    ``workbook_path`` may also be an uploaded file object.  Only the new
+    workbook is parsed.  The cycle label is taken from the file name unless
+    given.  An identical workbook (same SHA-256) is skipped, and a different
+    workbook for a cycle that is already stored raises CycleExists; ``force``
+    re-ingests and replaces the cycle's rows in both cases.  Returns the
+    cycle label, or None if the workbook was skipped.
+    """
+    source_name = os.path.basename(getattr(workbook_path, 'name', workbook_path))
+    digest = sheet_cache.file_digest(workbook_path)
+    sheet_name = dpm_sheet.find_sheet_name(workbook_loader.list_sheets(workbook_path))
+    if sheet_name is None:
+        raise ValueError(f"No 'State DPM wise status' sheet in {source_name}")
+    if cycle is None:
+        # Not the sheet name: the sheets of every cycle's workbook are named "Cycle 1 ..."
+        cycle = output_backends.cycle_from_name(source_name)
+    if cycle is None:
+        raise ValueError(f"Could not tell the cycle of {source_name}; pass it explicitly")
+
+    connection = connect(path)
+    try:
+        existing = connection.execute(
+            "SELECT sha256, position, source_file FROM cycles WHERE cycle = ?", (cycle,)
+        ).fetchone()
+        if existing and not force:
+            if existing[0] == digest:
+                return None
+            raise CycleExists(f"{cycle} is already in the store from {existing[2]}")
+
+        raw = workbook_loader.read_workbook(workbook_path, [sheet_name], dtype=str)[sheet_name]
+        districts, totals = dpm_sheet.extract_district_metrics(raw)
+        questions = dpm_sheet.percent_metrics(districts.columns)
+
+        long_values = districts.melt(id_vars=['District'], value_vars=questions,
+                                     var_name='question', value_name='value')
+        long_values = long_values.dropna(subset=['District'])
+        # State-level value per question: the sheet's Total row, else the district mean
+        summary = {question: totals.get(question) for question in questions}
+        for question, value in summary.items():
+            if value is None or pd.isna(value):
+                summary[question] = districts[question].mean()
+
+        position = existing[1] if existing else connection.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM cycles"
+        ).fetchone()[0]
+        with connection:
+            connection.execute("DELETE FROM district_values WHERE cycle = ?", (cycle,))
+            connection.execute("DELETE FROM cycle_summary WHERE cycle = ?", (cycle,))
+            connection.executemany(
+                "INSERT OR REPLACE INTO district_values (question, district, cycle, value) "
+                "VALUES (?, ?, ?, ?)",
+                [(row.question, row.District, cycle, None if pd.isna(row.value) else float(row.value))
+                 for row in long_values.itertuples(index=False)]
+            )
+            connection.executemany(
+                "INSERT INTO cycle_summary (question, cycle, value) VALUES (?, ?, ?)",
+                [(question, cycle, None if pd.isna(value) else float(value))
+                 for question, value in summary.items()]
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO cycles (cycle, position, source_file, sha256, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cycle, position, source_name, digest, time.time())
+            )
+        return cycle
+    finally:
+        connection.close()
+
+
+def version(path=None):
+    """A value that changes whenever a cycle is ingested, for cache keys"""
+    path = path or DEFAULT_STORE_PATH
+    if not os.path.exists(path):
+        return None
+    connection = connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*), MAX(ingested_at) FROM cycles").fetchone()
+    finally:
+        connection.close()
+
+
+def comparison_table(path=None):
+    """Questions x cycles table in the same shape as the "Comparison Graph" sheet"""
+    connection = connect(path)
+    try:
+        summary = pd.read_sql_query(
+            "SELECT s.question AS Questions, s.cycle, s.value FROM cycle_summary s "
+            "JOIN cycles c ON c.cycle = s.cycle ORDER BY c.position",
+            connection
+        )
+        cycles = ordered_cycles(connection)
+    finally:
+        connection.close()
+    if summary.empty:
+        return pd.DataFrame(columns=['Questions'])
+    table = summary.pivot(index='Questions', columns='cycle', values='value')
+    # Keep questions in first-seen order and cycles in chronological order
+    table = table.reindex(index=summary['Questions'].drop_duplicates(), columns=cycles)
+    table.columns.name = None
+    return table.reset_index()
+
+
+def district_values(path=None, cycles=None):
+    """Long-format district values, optionally limited to some cycles"""
+    connection = connect(path)
+    try:
+        query = "SELECT question, district, cycle, value FROM district_values"
+        params = []
+        if cycles:
+            query += f" WHERE cycle IN ({', '.join('?' for _ in cycles)})"
+            params = list(cycles)
+        return pd.read_sql_query(query, connection, params=params)
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the multi-cycle LNC data store")
+    parser.add_argument("--db", default=None,
+                        help=f"Store path (default: {DEFAULT_STORE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Add Cycle workbooks to the store")
+    ingest_parser.add_argument("workbooks", nargs="+")
+    ingest_parser.add_argument("--cycle", default=None,
+                               help="Cycle label (default: taken from the file name)")
+    ingest_parser.add_argument("--force", action="store_true",
+                               help="Re-ingest even if the workbook is unchanged, and replace a "
+                                    "cycle that was ingested from a different workbook")
+
+    subparsers.add_parser("show", help="Print the cycle comparison table")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        for workbook in args.workbooks:
+            try:
+                cycle = ingest(workbook, cycle=args.cycle, path=args.db, force=args.force)
+            except CycleExists as e:
+                print(f"Refused {workbook}: {str(e)} (use --force to replace it)")
+                return 1
+            except Exception as e:
+                print(f"Error ingesting {workbook}: {str(e)}")
+                return 1
+            if cycle is None:
+                print(f"Skipped {workbook}: already ingested")
+            else:
+                print(f"Ingested {workbook} as {cycle}")
+    else:
+        print(comparison_table(args.db).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+"""Pure data-preparation steps behind the dashboard views.
+
+Nothing here touches Streamlit, so the dashboard can cache each step by the
+hash of its input and other tools (benchmarks, exports) can reuse them.
+"""
+import os
+
+import pandas as pd
+
+import metric_registry
+import type_inference
+
+# Districts charted at once before the District Performance chart offers top/bottom slices
+CHART_DISTRICT_LIMIT = int(os.environ.get("LNC_CHART_DISTRICTS", "30"))
+# Metrics/questions pre-selected in the District Performance and cycle trend charts
+DEFAULT_DISTRICT_METRICS = 2
+DEFAULT_TREND_QUESTIONS = 3
+
+
+def clean_questions(questions):
+    """Make question labels chart-friendly: drop '%' and turn '/' into '-'"""
+    return (questions.astype(str)
+            .str.replace('%', '', regex=False)
+            .str.replace('/', '-', regex=False)
+            .str.strip())
+
+
+def clean_comparison(comparison_df):
+    """Clean the "Comparison Graph" sheet into Questions + numeric cycle columns"""
+    comparison_cleaned = comparison_df.copy()
+    # First row might contain dates - identify and skip. Type inference turns
+    # those date/label cells into missing values, so an empty row counts too
+    first_row = comparison_cleaned.iloc[0, 1:]
+    first_row_labels = first_row[first_row.map(lambda value: isinstance(value, str))]
+    if first_row.isna().all() or pd.to_datetime(first_row_labels, errors='coerce').notna().any():
+        comparison_cleaned = comparison_cleaned.iloc[1:].reset_index(drop=True)
+    comparison_cleaned = comparison_cleaned.fillna(0)  # Replace NaN with 0
+
+    # Convert percentage columns to numeric
+    for col in comparison_cleaned.columns:
+        if col != 'Questions':
+            comparison_cleaned[col] = type_inference.widen_floats(comparison_cleaned[col])
+
+    if 'Questions' in comparison_cleaned.columns:
+        comparison_cleaned['Questions'] = clean_questions(comparison_cleaned['Questions'])
+    return comparison_cleaned
+
+
+def overview_kpis(comparison, cycle='Cycle 1'):
+    """Headline values of the Implementation Overview as (label, value) pairs; value is None if missing.
+
+    Questions are found through the metric registry, so reordered or
+    reworded rows still resolve; see ``overview_mismatches`` for the misses.
+    """
+    if 'Questions' not in comparison.columns or cycle not in comparison.columns:
+        return [(metric.label, None) for metric in metric_registry.OVERVIEW_METRICS]
+    resolution = metric_registry.resolve(comparison['Questions'])
+    values = comparison[cycle].to_numpy()
+    return [(metric.label, None if resolution.positions.get(metric.key) is None
+             else values[resolution.positions[metric.key]])
+            for metric in metric_registry.OVERVIEW_METRICS]
+
+
+def overview_mismatches(comparison):
+    """Notes on overview metrics that matched fuzzily or not at all"""
+    if 'Questions' not in comparison.columns:
+        return ["'Questions' column not found in comparison data"]
+    return metric_registry.resolve(comparison['Questions']).mismatches()
+
+
+def cycle_columns(comparison):
+    """The 'Cycle ...' columns of a comparison table"""
+    return [col for col in comparison.columns if str(col).startswith('Cycle') and col != 'Questions']
+
+
+def cycle_trends_data(comparison, questions):
+    """Long-format Questions/Cycle/Percentage rows for the selected questions"""
+    filtered_data = comparison[comparison['Questions'].isin(questions)]
+    return filtered_data.melt(
+        id_vars=['Questions'],
+        value_vars=cycle_columns(comparison),
+        var_name='Cycle',
+        value_name='Percentage'
+    )
+
+
+def limit_districts(plot_data, scope, count):
+    """Keep the top or bottom ``count`` districts by their mean value.
+
+    ``scope`` is 'Top', 'Bottom' or 'All'.  Districts come back in ranking
+    order - best first for 'Top', worst first for 'Bottom'.
+    """
+    if scope not in ('Top', 'Bottom'):
+        return plot_data
+    means = plot_data.groupby('District', sort=False)['Percentage'].mean()
+    keep = means.nlargest(count) if scope == 'Top' else means.nsmallest(count)
+    order = {district: position for position, district in enumerate(keep.index)}
+    limited = plot_data[plot_data['District'].isin(order)]
+    return limited.iloc[limited['District'].map(order).argsort(kind='stable')]
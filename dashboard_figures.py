@@ -0,0 +1,127 @@
+"""Plotly figure builders for the dashboard views.
+
+Each function takes prepared data and returns a figure without touching
+Streamlit, so the dashboard can cache figures by dataset hash and selection.
+Large district charts switch to WebGL (Scattergl) traces above
+``WEBGL_THRESHOLD`` plotted rows, and values are rounded before they are
+serialized to keep the figure JSON sent to the browser small.  Plotly is
+imported on the first chart build, not when the dashboard starts.
+"""
+import os
+
+import numpy as np
+
+import dashboard_data
+
+# Plotted rows above which charts use WebGL instead of SVG
+WEBGL_THRESHOLD = int(os.environ.get("LNC_WEBGL_THRESHOLD", "2000"))
+# Percentages never need more precision than this on a chart
+VALUE_DECIMALS = 2
+DISTRIBUTION_BINS = 20
+
+
+def _compact(plot_data, value_col='Percentage'):
+    plot_data = plot_data.copy()
+    plot_data[value_col] = plot_data[value_col].astype('float64').round(VALUE_DECIMALS)
+    return plot_data
+
+
+def metrics_bar(comparison, cycle='Cycle 1'):
+    """Bar chart of every metric for one cycle (Implementation Overview)"""
+    import plotly.express as px
+
+    fig = px.bar(
+        comparison,
+        x='Questions',
+        y=cycle,
+        labels={'Questions': 'Metric', cycle: 'Percentage (%)'},
+        title=f'{cycle} Implementation Metrics',
+        color=cycle,
+        color_continuous_scale=px.colors.sequential.Blues
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def district_bar(plot_data, webgl_threshold=None):
+    """Grouped bar chart of district values per metric (District Performance).
+
+    Above the WebGL threshold the bars become one Scattergl marker trace per
+    metric, which the browser draws on a canvas instead of as SVG elements.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    threshold = WEBGL_THRESHOLD if webgl_threshold is None else webgl_threshold
+    plot_data = _compact(plot_data)
+    title = 'District Performance by Key Metrics'
+    if len(plot_data) <= threshold:
+        fig = px.bar(
+            plot_data,
+            x='District',
+            y='Percentage',
+            color='Metric',
+            barmode='group',
+            title=title,
+            labels={'Percentage': 'Percentage (%)', 'District': 'District Name'}
+        )
+    else:
+        fig = go.Figure([
+            go.Scattergl(x=group['District'], y=group['Percentage'], mode='markers', name=metric)
+            for metric, group in plot_data.groupby('Metric', sort=False)
+        ])
+        fig.update_layout(title=title, xaxis_title='District Name', yaxis_title='Percentage (%)',
+                          legend_title_text='Metric')
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def district_distribution(plot_data, bins=DISTRIBUTION_BINS):
+    """Histogram of district values per metric, binned on the server.
+
+    Only the bin counts are sent to the browser, so the payload no longer
+    grows with the number of districts.
+    """
+    import plotly.graph_objects as go
+
+    values = plot_data['Percentage'].astype('float64')
+    edges = np.histogram_bin_edges(values.dropna(), bins=bins) if values.notna().any() else np.arange(bins + 1)
+    labels = [f"{low:.0f}-{high:.0f}" for low, high in zip(edges[:-1], edges[1:])]
+    traces = []
+    for metric, group in plot_data.groupby('Metric', sort=False):
+        counts, _ = np.histogram(group['Percentage'].astype('float64').dropna(), bins=edges)
+        traces.append(go.Bar(x=labels, y=counts, name=metric))
+    fig = go.Figure(traces)
+    fig.update_layout(barmode='group', title='Distribution of District Performance',
+                      xaxis_title='Percentage (%)', yaxis_title='Number of districts',
+                      legend_title_text='Metric')
+    return fig
+
+
+def cycle_trends(comparison, questions, webgl_threshold=None):
+    """Line chart of the selected questions across cycles (Comparison Across Cycles)"""
+    import plotly.express as px
+
+    threshold = WEBGL_THRESHOLD if webgl_threshold is None else webgl_threshold
+    plot_data = _compact(dashboard_data.cycle_trends_data(comparison, questions))
+    return px.line(
+        plot_data,
+        x='Cycle',
+        y='Percentage',
+        color='Questions',
+        markers=True,
+        render_mode='webgl' if len(plot_data) > threshold else 'svg',
+        labels={'Percentage': 'Percentage (%)', 'Cycle': 'Implementation Cycle'},
+        title='Implementation Metrics Across Cycles'
+    )
+
+
+def describe(fig):
+    """Rendering facts for the debug panel: points, WebGL use and JSON payload size"""
+    points = sum(len(trace.x) if trace.x is not None else 0 for trace in fig.data)
+    return {
+        'traces': len(fig.data),
+        'points': points,
+        'webgl': any(trace.type.endswith('gl') for trace in fig.data),
+        'payload_bytes': len(fig.to_json().encode('utf-8')),
+    }
@@ -0,0 +1,161 @@
+"""Process-wide data for sessions that use the default workbooks.
+
+The dashboard keeps one DataService per server process (through
+``st.cache_resource``), so every session viewing the default files shares a
+single parsed copy.  A background thread polls the workbooks' modification
+times; when a file changes and has stopped changing, the data is re-parsed
+off the request path and swapped in as a new Snapshot.  Sessions always read
+a complete snapshot - never a half-updated one - and never wait for a reparse.
+
+Each Snapshot times its own build (loading, district extraction, cleaning)
+in ``stage_records``, since that work happens outside any session's run.
+"""
+import os
+import threading
+import time
+
+import dashboard_data
+import dpm_sheet
+import instrumentation
+import parallel_loader
+import sheet_cache
+import uploads
+import workbook_loader
+
+# Seconds between checks of the default workbooks' modification times
+POLL_SECONDS = float(os.environ.get("LNC_WATCH_SECONDS", "5"))
+
+CYCLE1_SHEETS = ["Cycle 1", "Cycle 1 State DPM wise status"]
+COMPARISON_SHEET = "Comparison Graph"
+
+
+def _cache_state(digest, keys):
+    """'hit' if every key is already in the sheet cache, else 'miss'"""
+    return 'hit' if all(sheet_cache.has_sheet(digest, key) for key in keys) else 'miss'
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Snapshot:
+    """Everything the dashboard needs from one version of the default workbooks"""
+
+    def __init__(self, cycle1_file, comparison_file, loader=None):
+        self.cycle1_file = cycle1_file
+        self.comparison_file = comparison_file
+        self.file_states = (_file_state(cycle1_file), _file_state(comparison_file))
+        self.cycle1_digest = sheet_cache.file_digest(cycle1_file)
+        self.comparison_digest = sheet_cache.file_digest(comparison_file)
+
+        streaming = uploads.streaming_mode()
+        records = []
+        if loader is not None:
+            # Parse both workbooks side by side in the loader's thread pool
+            loads = loader.workbook(cycle1_file, self.cycle1_digest, CYCLE1_SHEETS,
+                                    district_sheet=CYCLE1_SHEETS[1], streaming=streaming)
+            comparison_loads = loader.workbook(comparison_file, self.comparison_digest, [COMPARISON_SHEET],
+                                               streaming=streaming)
+            records += loads.pop(parallel_loader.STAGE_RECORDS).result()
+            records += comparison_loads.pop(parallel_loader.STAGE_RECORDS).result()
+            loads.update(comparison_loads)
+            self.cycle1_df, self.cycle1_state_df, self.comparison_df, self.district_index = (
+                loads[name].result() for name in CYCLE1_SHEETS + [COMPARISON_SHEET, parallel_loader.DISTRICT_INDEX]
+            )
+        else:
+            with uploads.parse_slot():
+                start, cache = time.perf_counter(), _cache_state(self.cycle1_digest, CYCLE1_SHEETS)
+                cycle1_sheets = workbook_loader.load_sheets(cycle1_file, self.cycle1_digest, CYCLE1_SHEETS,
+                                                            streaming=streaming)
+                records.append(instrumentation.stage_record(
+                    f"load_data: {os.path.basename(cycle1_file)}", start, cache, CYCLE1_SHEETS
+                ))
+                start, cache = time.perf_counter(), _cache_state(self.comparison_digest, [COMPARISON_SHEET])
+                self.comparison_df = workbook_loader.load_sheets(
+                    comparison_file, self.comparison_digest, [COMPARISON_SHEET], streaming=streaming
+                )[COMPARISON_SHEET]
+                records.append(instrumentation.stage_record(
+                    f"load_data: {os.path.basename(comparison_file)}", start, cache, [COMPARISON_SHEET]
+                ))
+                start = time.perf_counter()
+                cache = _cache_state(self.cycle1_digest, [dpm_sheet.DISTRICT_METRICS_KEY])
+                self.district_index = dpm_sheet.load_district_index(cycle1_file, self.cycle1_digest,
+                                                                    streaming=streaming)
+                records.append(instrumentation.stage_record(
+                    "district_extraction", start, cache, [parallel_loader.DISTRICT_INDEX]
+                ))
+            self.cycle1_df, self.cycle1_state_df = (cycle1_sheets[name] for name in CYCLE1_SHEETS)
+        start = time.perf_counter()
+        self.comparison_cleaned = dashboard_data.clean_comparison(self.comparison_df)
+        records.append(instrumentation.stage_record("clean_comparison", start, 'miss', ['Comparison cleaned']))
+        self.loaded_at = time.time()
+
+        self.stage_records = instrumentation.with_frame_sizes(records, {
+            **dict(zip(CYCLE1_SHEETS, (self.cycle1_df, self.cycle1_state_df))),
+            COMPARISON_SHEET: self.comparison_df,
+            parallel_loader.DISTRICT_INDEX: self.district_index,
+            'Comparison cleaned': self.comparison_cleaned,
+        })
+        if instrumentation.ENABLED:
+            instrumentation.write_records(self.stage_records, run='shared-defaults', loaded_at=self.loaded_at)
+
+
+class DataService:
+    """Loads the default workbooks once and keeps them current in the background"""
+
+    def __init__(self, cycle1_file, comparison_file, poll_seconds=None, loader=None):
+        self.cycle1_file = cycle1_file
+        self.comparison_file = comparison_file
+        self.poll_seconds = POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.loader = loader
+        self.last_error = None
+        self._snapshot = Snapshot(cycle1_file, comparison_file, loader)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        """The current Snapshot; a reference read, so it never blocks"""
+        return self._snapshot
+
+    def start(self):
+        """Start the background watcher thread (once)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="lnc-data-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        attempted = self._snapshot.file_states
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                states = (_file_state(self.cycle1_file), _file_state(self.comparison_file))
+            except OSError:
+                # A file is being replaced; look again on the next poll
+                continue
+            if states == attempted:
+                pending = None
+                continue
+            # Only reparse once a changed file has stopped changing for a poll,
+            # so a workbook that is still being saved isn't read half-written
+            if states != pending:
+                pending = states
+                continue
+            attempted, pending = states, None
+            self.refresh()
+
+    def refresh(self):
+        """Re-parse the workbooks and swap in the new data; keeps the old data on failure"""
+        try:
+            snapshot = Snapshot(self.cycle1_file, self.comparison_file, self.loader)
+        except Exception as e:
+            self.last_error = f"Could not reload the default files: {e}"
+            return False
+        # A single reference assignment, so readers see either the old or the new snapshot
+        self._snapshot = snapshot
+        self.last_error = None
+        return True
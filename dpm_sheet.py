@@ -0,0 +1,225 @@
+"""Header-aware parsing of the "State DPM wise status" sheet.
+
+The sheet starts with a state-wide table whose header spans two rows: a
+merged group row ("Central Workshop", "CDPO Level", ...) above the column
+labels ("District", "% of LS attended workshop", ...), followed by one row
+per district and a "Total" row.  Further DPM-wise blocks repeat the same
+districts and are ignored.  The functions here expect the sheet as read with
+``dtype=str`` so the header labels are still present.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import sheet_cache
+import type_inference
+import workbook_loader
+
+DISTRICT_LABEL = "district"
+DPM_LABEL = "dpm"
+PO_LABEL = "po"
+TOTAL_LABEL = "total"
+
+# Sheet cache key for the extracted district table
+DISTRICT_METRICS_KEY = "district metrics"
+INFO_COLUMNS = ['District', 'DPM', 'PO']
+
+
+def _clean_label(value):
+    if pd.isna(value):
+        return None
+    return re.sub(r'\s+', ' ', str(value)).strip() or None
+
+
+def find_sheet_name(sheet_names):
+    """Return the DPM wise status sheet from a workbook's sheet names, if any"""
+    for name in sheet_names:
+        if 'dpm wise status' in name.lower():
+            return name
+    return None
+
+
+def resolve_header(raw):
+    """Locate the state-wide table and name its columns.
+
+    Returns ``(label_row, names)`` where ``label_row`` is the position of the
+    row holding the column labels and ``names`` maps column position to a
+    unique metric name.  Labels that repeat within the row, such as "Total",
+    are prefixed with their merged group: "CDPO Level - Total".
+    """
+    values = raw.to_numpy(dtype=object)
+    label_row = None
+    for i, row in enumerate(values):
+        if any(_clean_label(value) and _clean_label(value).lower() == DISTRICT_LABEL for value in row):
+            label_row = i
+            break
+    if label_row is None:
+        raise ValueError("Could not find a header row with a 'District' column")
+
+    labels = [_clean_label(value) for value in values[label_row]]
+    # Merged group cells only hold a value in their first column - carry it right
+    groups = []
+    current_group = None
+    for value in (values[label_row - 1] if label_row > 0 else [None] * len(labels)):
+        current_group = _clean_label(value) or current_group
+        groups.append(current_group)
+
+    counts = pd.Series([label for label in labels if label]).value_counts()
+    names = {}
+    for position, label in enumerate(labels):
+        if not label:
+            continue
+        if counts[label] > 1 and groups[position]:
+            label = f"{groups[position]} - {label}"
+        names[position] = label
+    return label_row, names
+
+
+def extract_district_metrics(raw):
+    """Extract the state-wide district table from a raw DPM wise status sheet.
+
+    Returns ``(districts, totals)``: a DataFrame with a 'District' column (plus
+    'DPM'/'PO' when present) and one float column per named metric, and a
+    Series of the same metrics from the sheet's "Total" row (empty if the
+    table has no total row).
+    """
+    label_row, names = resolve_header(raw)
+    lowered = {name.lower(): position for position, name in names.items()}
+    district_pos = lowered[DISTRICT_LABEL]
+    dpm_pos = lowered.get(DPM_LABEL)
+    text_positions = {district_pos, dpm_pos, lowered.get(PO_LABEL)} - {None}
+
+    # Rows after the header up to the "Total" row or the first blank district cell
+    body = raw.iloc[label_row + 1:]
+    end = len(body)
+    total_row = None
+    for offset in range(len(body)):
+        row = body.iloc[offset]
+        dpm_label = _clean_label(row.iloc[dpm_pos]) if dpm_pos is not None else None
+        if dpm_label and dpm_label.lower() == TOTAL_LABEL:
+            end, total_row = offset, row
+            break
+        if _clean_label(row.iloc[district_pos]) is None:
+            end = offset
+            break
+    body = body.iloc[:end]
+
+    columns = {}
+    for position, name in names.items():
+        values = body.iloc[:, position]
+        if position in text_positions:
+            columns[name] = values.map(_clean_label)
+        else:
+            columns[name] = type_inference.parse_numbers(values)
+    districts = pd.DataFrame(columns).reset_index(drop=True)
+    districts = districts.rename(columns={names[district_pos]: 'District'})
+    if dpm_pos is not None:
+        districts = districts.rename(columns={names[dpm_pos]: 'DPM'})
+    if lowered.get(PO_LABEL) is not None:
+        districts = districts.rename(columns={names[lowered[PO_LABEL]]: 'PO'})
+
+    metric_names = [name for position, name in names.items() if position not in text_positions]
+    if total_row is not None:
+        totals = type_inference.parse_numbers(
+            pd.Series([total_row.iloc[position] for position, name in names.items()
+                       if position not in text_positions], index=metric_names)
+        )
+    else:
+        totals = pd.Series(dtype='float64')
+    return districts, totals
+
+
+def percent_metrics(columns):
+    """Metric names that hold percentages ('% of LS attended workshop', ...)"""
+    return [col for col in columns if str(col).split(' - ')[-1].startswith('%')]
+
+
+class DistrictIndex:
+    """District x metric matrix with precomputed state rollups.
+
+    Built once per workbook; selecting districts or metrics afterwards only
+    slices the in-memory arrays.  ``ranks`` are 1 for the best district and
+    ``percentiles`` run from 0 (lowest) to 100 (highest) per metric.
+    """
+
+    def __init__(self, districts, totals=None):
+        self.info = districts[[col for col in INFO_COLUMNS if col in districts.columns]].reset_index(drop=True)
+        self.districts = self.info['District'].tolist()
+        self.metrics = [col for col in districts.columns if col not in INFO_COLUMNS]
+        self.values = districts[self.metrics].to_numpy(dtype='float64')
+        self.metric_position = {metric: i for i, metric in enumerate(self.metrics)}
+
+        # State totals come from the sheet's Total row; fall back to column
+        # sums for counts and means for percentages
+        percentages = set(percent_metrics(self.metrics))
+        fallback = np.where(
+            [metric in percentages for metric in self.metrics],
+            np.nanmean(self.values, axis=0) if len(self.values) else np.nan,
+            np.nansum(self.values, axis=0)
+        )
+        totals = pd.Series(dtype='float64') if totals is None else totals
+        self.totals = pd.Series(
+            [totals.get(metric, np.nan) for metric in self.metrics], index=self.metrics, dtype='float64'
+        ).fillna(pd.Series(fallback, index=self.metrics))
+
+        ranked = pd.DataFrame(self.values, columns=self.metrics)
+        self.ranks = ranked.rank(ascending=False, method='min').to_numpy()
+        self.percentiles = (ranked.rank(pct=True, method='max') * 100).to_numpy()
+
+    @property
+    def percent_metrics(self):
+        return percent_metrics(self.metrics)
+
+    @property
+    def nbytes(self):
+        """Memory held by the index arrays and district info"""
+        arrays = self.values.nbytes + self.ranks.nbytes + self.percentiles.nbytes
+        return int(arrays + self.info.memory_usage(deep=True).sum())
+
+    def _columns(self, metrics):
+        return [self.metric_position[metric] for metric in metrics]
+
+    def table(self, metrics):
+        """District names plus the chosen metric columns"""
+        table = pd.DataFrame(self.values[:, self._columns(metrics)], columns=metrics)
+        table.insert(0, 'District', self.districts)
+        return table
+
+    def long(self, metrics, value_name='Percentage'):
+        """District/Metric/value rows for the chosen metrics, ready to plot"""
+        columns = self._columns(metrics)
+        return pd.DataFrame({
+            'District': np.tile(self.districts, len(columns)),
+            'Metric': np.repeat(metrics, len(self.districts)),
+            value_name: self.values[:, columns].T.ravel(),
+        })
+
+    def ranking(self, metric):
+        """Districts ordered best first for one metric, with rank and percentile"""
+        column = self.metric_position[metric]
+        ranking = self.info.copy()
+        ranking[metric] = self.values[:, column]
+        ranking['Rank'] = self.ranks[:, column]
+        ranking['Percentile'] = self.percentiles[:, column].round(1)
+        return ranking.sort_values(['Rank', 'District'], na_position='last').reset_index(drop=True)
+
+
+def load_district_index(source, digest, sheet_name="Cycle 1 State DPM wise status", streaming=None, raw=None):
+    """Build the DistrictIndex for a workbook, reusing the on-disk sheet cache.
+
+    The extracted district table is cached under the workbook digest, with
+    the Total row in the entry's metadata, so the header resolution runs
+    once per file.  ``raw`` is the sheet already
+    read with ``dtype=str``, if the caller has it.
+    """
+    districts, metadata = sheet_cache.read_entry(digest, DISTRICT_METRICS_KEY)
+    if districts is None or 'totals' not in metadata:
+        if raw is None:
+            raw = workbook_loader.read_workbook(source, [sheet_name], dtype=str, streaming=streaming)[sheet_name]
+        districts, totals = extract_district_metrics(raw)
+        metadata = {'totals': {metric: (None if pd.isna(value) else float(value))
+                               for metric, value in totals.items()}}
+        sheet_cache.write_sheet(digest, DISTRICT_METRICS_KEY, districts, metadata=metadata)
+    totals = pd.Series(metadata['totals'], dtype='float64')
+    return DistrictIndex(districts, totals)
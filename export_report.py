@@ -0,0 +1,261 @@
+"""Headless export of the dashboard views to static report files.
+
+Renders the three dashboard views - Implementation Overview, District
+Performance and Comparison Across Cycles - for a batch of Cycle workbooks,
+using the same data preparation (dashboard_data) and figure builders
+(dashboard_figures) as the dashboard.  Each workbook gets a folder with a
+self-contained ``index.html`` (plotly.js is embedded, so it opens offline)
+and, when kaleido is installed, one PNG/PDF per chart.  Workbooks are
+rendered in parallel processes and unchanged ones are skipped, so the
+command can run nightly from a scheduler.
+
+Usage:
+    python export_report.py "Cycle 1 LNC Implementation  Analysis January 25.xlsx" \
+        --comparison "LNC Implementation Comparison Graph January 25.xlsx" -o reports
+"""
+import argparse
+import html
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import dashboard_data
+import dashboard_figures
+import dpm_sheet
+import output_backends
+import read_excel_files
+import sheet_cache
+import workbook_loader
+
+COMPARISON_SHEET = "Comparison Graph"
+IMAGE_FORMATS = ['png', 'pdf']
+MANIFEST_NAME = ".report_manifest.json"
+REPORT_FILE = "index.html"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 0.9em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+.kpis {{ display: flex; gap: 2em; }}
+.kpi strong {{ display: block; font-size: 1.6em; }}
+.warning {{ color: #8a6d3b; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Generated {generated} from {source}</p>
+{body}
+</body>
+</html>
+"""
+
+
+def load_comparison(comparison_file=None, use_store=False):
+    """Cleaned comparison table from a Comparison Graph workbook or the cycle store"""
+    if use_store:
+        import cycle_store
+
+        table = cycle_store.comparison_table()
+        table['Questions'] = dashboard_data.clean_questions(table['Questions'])
+        return table
+    digest = sheet_cache.file_digest(comparison_file)
+    comparison_df = workbook_loader.load_sheets(comparison_file, digest, [COMPARISON_SHEET])[COMPARISON_SHEET]
+    return dashboard_data.clean_comparison(comparison_df)
+
+
+def comparison_digest(comparison):
+    """Content hash of a comparison table"""
+    return format(int(pd.util.hash_pandas_object(comparison, index=False).sum()) & (2 ** 64 - 1), 'x')
+
+
+def image_formats_available(formats):
+    """Requested image formats, or none if kaleido (plotly's image export) is missing"""
+    if formats and importlib.util.find_spec("kaleido") is None:
+        print("kaleido is not installed - skipping PNG/PDF export (pip install kaleido)")
+        return []
+    return list(formats or [])
+
+
+def _table_html(table):
+    return table.to_html(index=False, na_rep="N/A", float_format=lambda value: f"{value:.1f}", border=0)
+
+
+def build_views(index, comparison, cycle):
+    """Sections of the report as (heading, [(kind, content)]) with kind 'html' or 'figure'"""
+    # Implementation Overview
+    kpis = "".join(
+        f'<div class="kpi">{html.escape(label)}<strong>{"N/A" if value is None else f"{value}%"}</strong></div>'
+        for label, value in dashboard_data.overview_kpis(comparison, cycle)
+    )
+    overview = [('html', f'<div class="kpis">{kpis}</div>')]
+    overview += [('html', f'<p class="warning">Metric lookup: {html.escape(note)}</p>')
+                 for note in dashboard_data.overview_mismatches(comparison)]
+    if cycle in comparison.columns:
+        overview.append(('figure', ('metrics', dashboard_figures.metrics_bar(comparison, cycle))))
+
+    # District Performance: the dashboard's default metrics, and the top slice for large states
+    district = []
+    metric_cols = index.percent_metrics or index.metrics
+    if index.districts and metric_cols:
+        district.append(('html', _table_html(index.table(metric_cols))))
+        plot_data = index.long(metric_cols[:dashboard_data.DEFAULT_DISTRICT_METRICS])
+        if len(index.districts) > dashboard_data.CHART_DISTRICT_LIMIT:
+            plot_data = dashboard_data.limit_districts(plot_data, 'Top', dashboard_data.CHART_DISTRICT_LIMIT)
+        district.append(('figure', ('districts', dashboard_figures.district_bar(plot_data))))
+        district.append(('html', f'<h3>District Ranking: {html.escape(metric_cols[0])}</h3>'))
+        district.append(('html', _table_html(index.ranking(metric_cols[0]))))
+    else:
+        district.append(('html', '<p>No district rows found in the State DPM wise status sheet</p>'))
+
+    # Comparison Across Cycles
+    trends = [('html', _table_html(comparison))]
+    questions = comparison['Questions'].dropna().astype(str).tolist() if 'Questions' in comparison.columns else []
+    if questions and dashboard_data.cycle_columns(comparison):
+        trends.append(('figure', ('cycle_trends', dashboard_figures.cycle_trends(
+            comparison, questions[:dashboard_data.DEFAULT_TREND_QUESTIONS]
+        ))))
+
+    return [
+        ("Implementation Overview", overview),
+        ("District Performance Analysis", district),
+        ("Comparison Across Implementation Cycles", trends),
+    ]
+
+
+def write_report(sections, report_dir, title, source, image_formats=()):
+    """Write index.html (plotly.js embedded once) plus the chart images; returns the paths"""
+    os.makedirs(report_dir, exist_ok=True)
+    paths = []
+    body = []
+    include_plotlyjs = True
+    for heading, items in sections:
+        body.append(f"<h2>{html.escape(heading)}</h2>")
+        for kind, content in items:
+            if kind == 'html':
+                body.append(content)
+                continue
+            name, fig = content
+            body.append(fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs))
+            include_plotlyjs = False
+            for image_format in image_formats:
+                path = os.path.join(report_dir, f"{name}.{image_format}")
+                fig.write_image(path)
+                paths.append(path)
+
+    path = os.path.join(report_dir, REPORT_FILE)
+    page = PAGE_TEMPLATE.format(title=html.escape(title), source=html.escape(source),
+                                generated=time.strftime("%Y-%m-%d %H:%M"), body="\n".join(body))
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(page)
+    os.replace(path + ".tmp", path)
+    return [path] + paths
+
+
+def export_workbook(file_path, comparison, output_dir, image_formats=(), file_name=None):
+    """Render one Cycle workbook's report; returns its manifest entry"""
+    digest = sheet_cache.file_digest(file_path)
+    sheet_name = dpm_sheet.find_sheet_name(workbook_loader.list_sheets(file_path))
+    if sheet_name is None:
+        raise ValueError("No 'State DPM wise status' sheet found")
+    index = dpm_sheet.load_district_index(file_path, digest, sheet_name)
+    cycle = output_backends.cycle_from_name(file_path) or 'Cycle 1'
+
+    file_name = file_name or read_excel_files.output_name(file_path)
+    report_dir = os.path.join(output_dir, output_backends.table_name(file_name))
+    paths = write_report(build_views(index, comparison, cycle), report_dir,
+                         f"LNC Implementation Report - {cycle}", os.path.basename(file_path), image_formats)
+    print(f"Saved {len(paths)} file(s) for {file_name} in {report_dir}")
+    return {'mtime': os.path.getmtime(file_path), 'sha256': digest, 'format': 'report', 'name': file_name,
+            'report': os.path.abspath(paths[0]), 'outputs': [os.path.abspath(path) for path in paths],
+            'images': sorted(image_formats)}
+
+
+def is_current(file_path, entry, comparison_key, image_formats=()):
+    """True if a workbook's report is up to date: same workbook, comparison and image formats, and still on disk"""
+    if not entry or entry.get('comparison') != comparison_key:
+        return False
+    if not set(image_formats) <= set(entry.get('images', [])):
+        return False
+    if not os.path.exists(entry.get('report', '')):
+        return False
+    return read_excel_files.is_unchanged(file_path, entry, 'report')
+
+
+def run_batch(inputs, comparison, output_dir, workers=None, force=False, image_formats=()):
+    """Render a report for every workbook matched by inputs, fanning out over a process pool"""
+    os.makedirs(output_dir, exist_ok=True)
+    files = read_excel_files.find_workbooks(inputs)
+    manifest = read_excel_files.load_manifest(output_dir, MANIFEST_NAME)
+    names = read_excel_files.output_names(files, manifest)
+
+    # Reports also depend on the comparison table, so a new comparison re-renders them all
+    comparison_key = comparison_digest(comparison)
+    pending = [path for path in files
+               if force or not is_current(path, manifest.get(path), comparison_key, image_formats)]
+    skipped = len(files) - len(pending)
+    processed, failed = 0, 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_workbook, path, comparison, output_dir, image_formats, names[path]): path
+            for path in pending
+        }
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                manifest[file_path] = dict(future.result(), comparison=comparison_key)
+            except Exception as e:
+                failed += 1
+                print(f"Error exporting {file_path}: {str(e)}")
+                continue
+            processed += 1
+    elapsed = time.perf_counter() - start
+
+    read_excel_files.save_manifest(output_dir, manifest, MANIFEST_NAME)
+    print(f"Exported {processed} report(s), skipped {skipped} unchanged, {failed} failed "
+          f"in {elapsed:.2f}s")
+    return processed, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render the dashboard views of a batch of Cycle workbooks to static HTML "
+                    "(plus PNG/PDF charts with kaleido)"
+    )
+    parser.add_argument("inputs", nargs="+",
+                        help="Cycle workbook files, directories of .xlsx files or glob patterns")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--comparison",
+                        help="Comparison Graph workbook for the overview and cycle trends")
+    source.add_argument("--store", action="store_true",
+                        help="Take the cycle comparison from the cycle store instead")
+    parser.add_argument("-o", "--output-dir", default="reports",
+                        help="Directory for the report folders (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--images", nargs="*", default=[], choices=IMAGE_FORMATS,
+                        help="Also save every chart in these formats (requires kaleido)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render reports even if the workbooks are unchanged")
+    args = parser.parse_args(argv)
+
+    # The comparison is shared by every report, so it is loaded once here
+    comparison = load_comparison(args.comparison, use_store=args.store)
+    _, _, failed = run_batch(args.inputs, comparison, args.output_dir, workers=args.workers,
+                             force=args.force, image_formats=image_formats_available(args.images))
+    return 1 if failed else 0
+
+
+# Main execution
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""Opt-in stage timing for the dashboard.
+
+Each instrumented stage (load_data, cleaning, district extraction, figure
+builds) records its duration, whether its Streamlit cache was hit and the
+memory held by the DataFrames it returned.  Cached functions call
+``mark_miss()`` from their body, which only runs on a cache miss, so a stage
+whose body didn't run was served from the cache.  Work that runs outside the
+session - parse tasks in the loader's thread pool, the shared default data -
+times itself with ``stage_record`` and the records are added afterwards.
+Records are shown in the sidebar and appended as JSON lines to ``LOG_PATH``.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+# Record stage timings when LNC_INSTRUMENT is set (they can also be turned on in the sidebar)
+ENABLED = os.environ.get("LNC_INSTRUMENT", "").lower() in ("1", "true", "yes")
+# Structured log of stage records, one JSON object per line ("" disables it)
+LOG_PATH = os.environ.get(
+    "LNC_INSTRUMENT_LOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lnc_stage_timings.jsonl")
+)
+
+# Stage currently running in this thread, so mark_miss() knows what to flag
+_current = threading.local()
+
+
+def mark_miss():
+    """Call from the body of a cached function: the cache did not have the result"""
+    stage = getattr(_current, 'stage', None)
+    if stage is not None:
+        stage['cache'] = 'miss'
+
+
+def frame_bytes(obj):
+    """Memory held by the DataFrames/arrays in a result (tuples, lists, dicts and finished futures are searched)"""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, (tuple, list)):
+        return sum(frame_bytes(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(frame_bytes(item) for item in obj.values())
+    if isinstance(obj, Future):
+        return frame_bytes(obj.result()) if obj.done() and obj.exception() is None else 0
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    # Objects such as DistrictIndex report their own size
+    nbytes = getattr(obj, 'nbytes', None)
+    return int(nbytes) if isinstance(nbytes, (int, np.integer)) else 0
+
+
+def stage_record(stage_name, start, cache, results=()):
+    """Record of a stage timed outside a StageRecorder, started at ``start`` (perf_counter).
+
+    ``results`` names the task results the stage produced; their memory is
+    measured when the record is completed by ``with_frame_sizes``.
+    """
+    return {'stage': stage_name, 'cache': cache,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 2), 'results': list(results)}
+
+
+def with_frame_sizes(records, results):
+    """Complete ``stage_record`` records with the memory of their results (a name -> value dict)"""
+    return [
+        {**{key: value for key, value in record.items() if key != 'results'},
+         'frame_mb': round(sum(frame_bytes(results.get(name)) for name in record['results']) / 1e6, 3)}
+        for record in records
+    ]
+
+
+def write_records(records, log_path=None, **context):
+    """Append records to the JSON-lines log; ``context`` is added to each line"""
+    log_path = LOG_PATH if log_path is None else log_path
+    if not records or not log_path:
+        return
+    timestamp = time.time()
+    with open(log_path, 'a', encoding='utf-8') as log:
+        for record in records:
+            log.write(json.dumps({'ts': timestamp, **context, **record}) + "\n")
+
+
+class StageRecorder:
+    """Collects stage records for one dashboard run"""
+
+    def __init__(self, enabled=None, log_path=None):
+        self.enabled = ENABLED if enabled is None else enabled
+        self.log_path = LOG_PATH if log_path is None else log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+
+    def call(self, stage_name, func, *args, **kwargs):
+        """Run ``func`` as one stage and record it; a plain call when disabled"""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        record = {'stage': stage_name, 'cache': 'hit'}
+        previous = getattr(_current, 'stage', None)
+        _current.stage = record
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            _current.stage = previous
+        record['frame_mb'] = round(frame_bytes(result) / 1e6, 3)
+        self.records.append(record)
+        return result
+
+    def add(self, records, results):
+        """Add ``stage_record`` records of work done elsewhere; ``results`` maps result names to values"""
+        if self.enabled:
+            self.records.extend(with_frame_sizes(records, results))
+
+    def table(self):
+        """Records of this run as a DataFrame for the sidebar panel"""
+        return pd.DataFrame(self.records, columns=['stage', 'cache', 'duration_ms', 'frame_mb'])
+
+    def write_log(self, **context):
+        """Append this run's records to the JSON-lines log; ``context`` is added to each line"""
+        if self.enabled:
+            write_records(self.records, self.log_path, run=self.run_id, **context)
@@ -1,7 +1,17 @@
 import streamlit as st
 import pandas as pd
 import os
-import io
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import cycle_store
+import dashboard_data
+import data_service
+import dashboard_figures
+import instrumentation
+import parallel_loader
+import sheet_cache
+import uploads
 
 # Set page configuration
 st.set_page_config(
@@ -10,39 +20,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# Import visualization libraries only when needed
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-except ImportError:
-    st.warning("Plotly not found. Installing...")
-    # Auto-install if missing
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "plotly==5.14.1"])
-    import plotly.express as px
-    import plotly.graph_objects as go
-
 # Title and introduction
 st.title("LNC Implementation Dashboard")
 st.markdown("### Analysis and Visualization of LNC Implementation Data")
 
-# Function to safely convert columns to appropriate types
-def safe_convert_types(df):
-    try:
-        for col in df.columns:
-            # Try to convert numeric columns
-            try:
-                if df[col].dtype == 'object':
-                    # Try to convert to numeric, but keep as string if it fails
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-            except:
-                pass
-        return df
-    except Exception as e:
-        st.error(f"Error converting data types: {e}")
-        return df
-
 # Define default files (for local development)
 DEFAULT_CYCLE1_FILE = "Cycle 1 LNC Implementation  Analysis January 25.xlsx"
 DEFAULT_COMPARISON_FILE = "LNC Implementation Comparison Graph January 25.xlsx"
@@ -54,322 +35,439 @@ st.sidebar.markdown("Upload your Excel files or use the default files if availab
 uploaded_cycle1 = st.sidebar.file_uploader("Upload Cycle 1 Analysis File", type=["xlsx"])
 uploaded_comparison = st.sidebar.file_uploader("Upload Comparison Graph File", type=["xlsx"])
 
-# Function to load data with enhanced error handling
-@st.cache_data
-def load_data(cycle1_file, comparison_file):
+# Stage timings for this run; the toggle lives in the "Stage timings" panel below
+stages = instrumentation.StageRecorder(
+    enabled=st.session_state.get("instrument", instrumentation.ENABLED)
+)
+
+# Parser pool shared by every session. Each workbook is parsed as its own
+# task, so the Cycle 1 and Comparison workbooks are parsed side by side
+@st.cache_resource
+def sheet_loader():
+    return parallel_loader.SheetLoader()
+
+# Uploads are spooled to a temp file and hashed once per session; the
+# dashboard then works from the file path and its digest
+def spooled_upload(uploaded):
+    key = f"spooled-{uploaded.file_id}"
+    spooled = st.session_state.get(key)
+    if spooled is None or not os.path.exists(spooled[0]):
+        spooled = uploads.spool(uploaded)
+        st.session_state[key] = spooled
+    return spooled
+
+def select_file(uploaded, default_file):
+    """Return (path, digest) for the upload or the default file, or (None, None)"""
+    if uploaded is not None:
+        try:
+            return spooled_upload(uploaded)
+        except uploads.UploadTooLarge as e:
+            st.error(str(e))
+            return None, None
+    # Try to use the default file if it exists
+    if os.path.exists(default_file):
+        return default_file, sheet_cache.file_digest(default_file)
+    st.warning(f"Default file {default_file} not found. Please upload a file.")
+    return None, None
+
+# Sessions on the default files share one process-wide copy, which a background
+# thread reloads when the workbooks change on disk
+SHARED_DEFAULTS = os.environ.get("LNC_SHARED_DEFAULTS", "1").lower() not in ("0", "false", "no")
+
+@st.cache_resource
+def shared_data_service(cycle1_file, comparison_file):
+    return data_service.DataService(cycle1_file, comparison_file, loader=sheet_loader()).start()
+
+shared_data = None
+if (SHARED_DEFAULTS and uploaded_cycle1 is None and uploaded_comparison is None
+        and os.path.exists(DEFAULT_CYCLE1_FILE) and os.path.exists(DEFAULT_COMPARISON_FILE)):
     try:
-        # Load Cycle 1 data
-        if isinstance(cycle1_file, io.BytesIO):  # Uploaded file
-            cycle1_df = pd.read_excel(cycle1_file, sheet_name="Cycle 1", dtype=str)
-            cycle1_state_df = pd.read_excel(cycle1_file, sheet_name="Cycle 1 State DPM wise status", dtype=str)
-        else:  # Local file path
-            cycle1_df = pd.read_excel(cycle1_file, sheet_name="Cycle 1", dtype=str)
-            cycle1_state_df = pd.read_excel(cycle1_file, sheet_name="Cycle 1 State DPM wise status", dtype=str)
-        
-        # Load comparison data
-        if isinstance(comparison_file, io.BytesIO):  # Uploaded file
-            comparison_df = pd.read_excel(comparison_file, sheet_name="Comparison Graph", dtype=str)
-        else:  # Local file path
-            comparison_df = pd.read_excel(comparison_file, sheet_name="Comparison Graph", dtype=str)
-        
-        # Convert types safely
-        cycle1_df = safe_convert_types(cycle1_df)
-        cycle1_state_df = safe_convert_types(cycle1_state_df)
-        comparison_df = safe_convert_types(comparison_df)
-        
-        return cycle1_df, cycle1_state_df, comparison_df
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None, None, None
+        service = shared_data_service(DEFAULT_CYCLE1_FILE, DEFAULT_COMPARISON_FILE)
+        shared_data = service.snapshot()
+        if service.last_error:
+            st.sidebar.warning(service.last_error)
+        st.sidebar.caption(
+            f"Default files loaded at {time.strftime('%H:%M:%S', time.localtime(shared_data.loaded_at))}"
+        )
+    except Exception:
+        # Load per session instead, which reports the error
+        shared_data = None
 
 # Determine which files to use
-if uploaded_cycle1 is not None:
-    cycle1_file = uploaded_cycle1
+if shared_data is not None:
+    cycle1_file, cycle1_digest = shared_data.cycle1_file, shared_data.cycle1_digest
+    comparison_file, comparison_digest = shared_data.comparison_file, shared_data.comparison_digest
 else:
-    # Try to use the default file if it exists
-    if os.path.exists(DEFAULT_CYCLE1_FILE):
-        cycle1_file = DEFAULT_CYCLE1_FILE
+    cycle1_file, cycle1_digest = select_file(uploaded_cycle1, DEFAULT_CYCLE1_FILE)
+    comparison_file, comparison_digest = select_file(uploaded_comparison, DEFAULT_COMPARISON_FILE)
+
+# Comparison table from the multi-cycle store, re-queried only after an ingest
+@st.cache_data
+def load_cycle_comparison(store_version):
+    instrumentation.mark_miss()
+    table = cycle_store.comparison_table()
+    # Clean questions the same way as the Comparison Graph sheet
+    table['Questions'] = dashboard_data.clean_questions(table['Questions'])
+    return table
+
+# Cleaning and figure building are cached by the hash of their input data, so
+# a widget change in one tab doesn't redo the work behind the other tabs
+@st.cache_data
+def clean_comparison_data(comparison_digest, _comparison_df):
+    instrumentation.mark_miss()
+    return dashboard_data.clean_comparison(_comparison_df)
+
+# Figure functions return (figure, rendering stats) for the debug panel
+@st.cache_data(max_entries=64)
+def metrics_figure(comparison_digest, _comparison_cleaned):
+    instrumentation.mark_miss()
+    fig = dashboard_figures.metrics_bar(_comparison_cleaned)
+    return fig, dashboard_figures.describe(fig)
+
+@st.cache_data(max_entries=64)
+def district_figure(cycle1_digest, selected_metrics, chart_scope, chart_count, _district_index):
+    instrumentation.mark_miss()
+    plot_data = _district_index.long(list(selected_metrics))
+    if chart_scope == "Distribution":
+        fig = dashboard_figures.district_distribution(plot_data)
     else:
-        st.warning(f"Default file {DEFAULT_CYCLE1_FILE} not found. Please upload a file.")
-        cycle1_file = None
+        fig = dashboard_figures.district_bar(dashboard_data.limit_districts(plot_data, chart_scope, chart_count))
+    return fig, dashboard_figures.describe(fig)
 
-if uploaded_comparison is not None:
-    comparison_file = uploaded_comparison
-else:
-    # Try to use the default file if it exists
-    if os.path.exists(DEFAULT_COMPARISON_FILE):
-        comparison_file = DEFAULT_COMPARISON_FILE
+@st.cache_data(max_entries=64)
+def trends_figure(comparison_key, selected_questions, _comparison):
+    instrumentation.mark_miss()
+    fig = dashboard_figures.cycle_trends(_comparison, list(selected_questions))
+    return fig, dashboard_figures.describe(fig)
+
+# Charts drawn in this run, listed in the rendering debug panel
+rendered_charts = []
+
+def show_chart(name, figure_and_stats):
+    fig, stats = figure_and_stats
+    rendered_charts.append({'Chart': name, **stats})
+    st.plotly_chart(fig, use_container_width=True)
+
+# Cycle store: append the current Cycle workbook so Tab 3 can compare cycles
+st.sidebar.header("Cycle Store")
+stored_cycles = cycle_store.version()
+st.sidebar.caption(f"{stored_cycles[0] if stored_cycles else 0} cycle(s) in the store")
+if cycle1_file is not None:
+    cycle_label = st.sidebar.text_input(
+        "Cycle label",
+        help="Leave blank to take the cycle from the file name"
+    )
+    replace_cycle = st.sidebar.checkbox(
+        "Replace the cycle if it is already stored",
+        help="Needed to overwrite a cycle that was added from a different workbook"
+    )
+    if st.sidebar.button("Add Cycle workbook to store"):
+        try:
+            with uploads.parse_slot():
+                ingested_cycle = cycle_store.ingest(cycle1_file, cycle=cycle_label or None,
+                                                    force=replace_cycle)
+            if ingested_cycle is None:
+                st.sidebar.info("This workbook is already in the store.")
+            else:
+                st.sidebar.success(f"Added {ingested_cycle} to the store.")
+        except cycle_store.CycleExists as e:
+            st.sidebar.warning(f"Not added: {e}. Tick \"Replace the cycle\" to overwrite it.")
+        except Exception as e:
+            st.sidebar.error(f"Could not add the workbook: {e}")
+
+# Each view is rendered by its own function, and only the selected view runs on
+# a rerun. Shared data comes from the caches above.
+def render_overview(comparison_cleaned, comparison_digest):
+    st.header("Implementation Overview")
+
+    # Key metrics from the Comparison Graph sheet, located through the metric
+    # registry so shifted or reworded rows still resolve (or are reported)
+    st.subheader("Key Implementation Metrics")
+
+    kpis = dashboard_data.overview_kpis(comparison_cleaned)
+    for column, (label, value) in zip(st.columns(len(kpis)), kpis):
+        with column:
+            st.metric(label, "N/A" if value is None else f"{value}%")
+    for note in dashboard_data.overview_mismatches(comparison_cleaned):
+        st.warning(f"Metric lookup: {note}")
+
+    # Create a bar chart for key metrics from comparison data
+    st.subheader("Implementation Metrics - Cycle 1")
+
+    # Create bar chart
+    try:
+        show_chart("Implementation metrics", stages.call(
+            "metrics_figure", metrics_figure, comparison_digest, comparison_cleaned
+        ))
+    except Exception as e:
+        st.error(f"Error creating bar chart: {e}")
+        st.write("Raw data:")
+        st.dataframe(comparison_cleaned)
+
+
+def render_district_performance(district_load, cycle1_digest):
+    st.header("District Performance Analysis")
+
+    # District x metric index with named metrics, built once per workbook and
+    # shared by every session, so widget changes only slice its arrays
+    district_index = None
+    try:
+        district_index = district_load.result()
+    except Exception as e:
+        st.error(f"Could not extract district data from the Excel file: {e}")
+
+    if district_index is not None and district_index.districts:
+        metric_cols = district_index.percent_metrics or district_index.metrics
+
+        # Display district data table
+        st.subheader("District Performance Table")
+        st.dataframe(district_index.table(metric_cols), use_container_width=True)
+
+        # Create district comparison chart
+        st.subheader("District Performance Comparison")
+
+        # Allow user to select metrics to compare
+        if metric_cols:
+            selected_metrics = st.multiselect(
+                "Select metrics to compare across districts",
+                options=metric_cols,
+                default=metric_cols[:dashboard_data.DEFAULT_DISTRICT_METRICS]
+            )
+
+            # Large states: chart a top/bottom slice or a binned distribution
+            # instead of sending every district to the browser
+            chart_scope, chart_count = "All", len(district_index.districts)
+            if len(district_index.districts) > dashboard_data.CHART_DISTRICT_LIMIT:
+                chart_scope = st.radio(
+                    "Districts in chart",
+                    ["Top", "Bottom", "All", "Distribution"],
+                    horizontal=True
+                )
+                if chart_scope in ("Top", "Bottom"):
+                    chart_count = st.slider(
+                        "Number of districts",
+                        min_value=1,
+                        max_value=len(district_index.districts),
+                        value=dashboard_data.CHART_DISTRICT_LIMIT
+                    )
+
+            if selected_metrics:
+                try:
+                    # Chart cached per workbook, metric selection and district slice
+                    show_chart("District performance", stages.call(
+                        "district_figure", district_figure,
+                        cycle1_digest, tuple(selected_metrics), chart_scope, chart_count, district_index
+                    ))
+                except Exception as e:
+                    st.error(f"Error creating district comparison chart: {e}")
+                    st.write("Raw data:")
+                    st.dataframe(district_index.table(selected_metrics))
+
+            # Rank districts against the state figure for one metric
+            st.subheader("District Ranking")
+            ranking_metric = st.selectbox("Rank districts by", options=metric_cols)
+            state_value = district_index.totals[ranking_metric]
+            st.metric(f"State: {ranking_metric}", "N/A" if pd.isna(state_value) else f"{state_value:.1f}")
+            st.dataframe(district_index.ranking(ranking_metric), use_container_width=True)
+    else:
+        st.error("No district rows found in the State DPM wise status sheet")
+
+
+def render_cycle_comparison(comparison_cleaned, comparison_digest):
+    st.header("Comparison Across Implementation Cycles")
+
+    # Prefer the multi-cycle store once cycles have been ingested into it
+    cycle_comparison = comparison_cleaned
+    comparison_key = comparison_digest
+    store_version = cycle_store.version()
+    if store_version and store_version[0]:
+        comparison_source = st.radio(
+            "Comparison data source",
+            ["Cycle store", "Comparison Graph sheet"],
+            horizontal=True
+        )
+        if comparison_source == "Cycle store":
+            cycle_comparison = stages.call("cycle_store_comparison", load_cycle_comparison, store_version)
+            comparison_key = f"cycle-store-{store_version}"
+
+    # Display comparison data
+    st.subheader("Cycle Comparison Data")
+    st.dataframe(cycle_comparison, use_container_width=True)
+
+    # Create line chart to compare metrics across cycles
+    st.subheader("Trends Across Implementation Cycles")
+
+    # Allow user to select metrics to compare
+    if 'Questions' in cycle_comparison.columns:
+        question_options = cycle_comparison['Questions'].dropna().astype(str).tolist()
+
+        if question_options:
+            selected_questions = st.multiselect(
+                "Select metrics to compare across cycles",
+                options=question_options,
+                default=question_options[:dashboard_data.DEFAULT_TREND_QUESTIONS]
+            )
+
+            if selected_questions:
+                try:
+                    if dashboard_data.cycle_columns(cycle_comparison):
+                        # Line chart, cached per dataset and question selection
+                        show_chart("Cycle trends", stages.call(
+                            "trends_figure", trends_figure,
+                            comparison_key, tuple(selected_questions), cycle_comparison
+                        ))
+                    else:
+                        st.error("No cycle columns found in the data")
+                except Exception as e:
+                    st.error(f"Error creating cycle comparison chart: {e}")
+                    st.write("Raw data for debugging:")
+                    st.dataframe(cycle_comparison[cycle_comparison['Questions'].isin(selected_questions)])
+        else:
+            st.error("No question options found in the data")
     else:
-        st.warning(f"Default file {DEFAULT_COMPARISON_FILE} not found. Please upload a file.")
-        comparison_file = None
+        st.error("'Questions' column not found in comparison data")
+
+
+VIEWS = ["Implementation Overview", "District Performance", "Comparison Across Cycles"]
+
+# Loads each view waits for before it renders
+DISTRICT_TABLE = parallel_loader.DISTRICT_INDEX
+VIEW_LOADS = {
+    "Implementation Overview": ["Comparison Graph"],
+    "District Performance": [DISTRICT_TABLE],
+    "Comparison Across Cycles": ["Comparison Graph"],
+}
+
+def start_loads(cycle1_file, cycle1_digest, comparison_file, comparison_digest):
+    """Start parsing both workbooks at once.
+
+    Returns a future per sheet and the district table, plus a future per
+    workbook for the stage records its parse task timed.
+    """
+    loader = sheet_loader()
+    streaming = uploads.streaming_mode()
+    loads = loader.workbook(cycle1_file, cycle1_digest, ["Cycle 1", "Cycle 1 State DPM wise status"],
+                            district_sheet="Cycle 1 State DPM wise status", streaming=streaming)
+    record_loads = [loads.pop(parallel_loader.STAGE_RECORDS)]
+    comparison_loads = loader.workbook(comparison_file, comparison_digest, ["Comparison Graph"], streaming=streaming)
+    record_loads.append(comparison_loads.pop(parallel_loader.STAGE_RECORDS))
+    loads.update(comparison_loads)
+    return loads, record_loads
+
+def wait_for(loads, names, progress):
+    """Wait until the named loads finish, updating the per-sheet progress as any load lands"""
+    while True:
+        finished = [name for name, load in loads.items() if load.done()]
+        progress.progress(
+            len(finished) / len(loads),
+            text="Loading: " + ", ".join(f"{name} {'✓' if name in finished else '…'}" for name in loads)
+        )
+        if all(loads[name].done() for name in names):
+            return [loads[name] for name in names]
+        # Had to wait for a parse, so the data wasn't ready from the cache
+        instrumentation.mark_miss()
+        wait([load for load in loads.values() if not load.done()], return_when=FIRST_COMPLETED)
 
 # Only proceed if we have data
 if cycle1_file is not None and comparison_file is not None:
-    # Load data
-    cycle1_df, cycle1_state_df, comparison_df = load_data(cycle1_file, comparison_file)
-    
-    if cycle1_df is not None and cycle1_state_df is not None and comparison_df is not None:
-        # Clean comparison data
-        comparison_cleaned = comparison_df.copy()
-        # First row might contain dates - identify and skip
-        if pd.to_datetime(comparison_cleaned.iloc[0, 1:], errors='coerce').notna().any():
-            comparison_cleaned = comparison_cleaned.iloc[1:].reset_index(drop=True)
-        comparison_cleaned.fillna(0, inplace=True)  # Replace NaN with 0
-        
-        # Convert percentage columns to numeric
-        for col in comparison_cleaned.columns:
-            if col != 'Questions':
-                comparison_cleaned[col] = pd.to_numeric(comparison_cleaned[col], errors='coerce')
-
-        # Create tabs for different views
-        tab1, tab2, tab3 = st.tabs(["Implementation Overview", "District Performance", "Comparison Across Cycles"])
-
-        # Tab 1: Implementation Overview
-        with tab1:
-            st.header("Implementation Overview")
-            
-            # Display key metrics from the State DPM wise status sheet
-            st.subheader("Key Implementation Metrics")
-            
-            # Filter out rows with sensible data (remove headers)
-            state_data = cycle1_state_df[cycle1_state_df['CG State wide Implementation table'].notna() & 
-                                         (cycle1_state_df['CG State wide Implementation table'] != 'NaN')]
-            
-            # Calculate overall metrics
-            if not state_data.empty:
-                metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
-                
-                # Find columns with percentages (may need adjustment based on your actual data)
-                dpo_attendance_col = '% DPOs/ DWCDOs attended central workshop'
-                cdpo_attendance_col = '% of CDPOs Attended workshop'
-                ls_attendance_col = '% of LS attended workshop'
-                aww_attendance_col = '% of AWWs received training'
-                
-                # Try to find columns - if they don't exist exactly, use closest match
-                if dpo_attendance_col not in state_data.columns:
-                    dpo_attendance_col = [col for col in state_data.columns if '% DPO' in col and 'attend' in col.lower()]
-                    dpo_attendance_col = dpo_attendance_col[0] if dpo_attendance_col else None
-                
-                if cdpo_attendance_col not in state_data.columns:
-                    cdpo_attendance_col = [col for col in state_data.columns if '% CDPO' in col and 'attend' in col.lower()]
-                    cdpo_attendance_col = cdpo_attendance_col[0] if cdpo_attendance_col else None
-                    
-                if ls_attendance_col not in state_data.columns:
-                    ls_attendance_col = [col for col in state_data.columns if '% LS' in col and 'attend' in col.lower()]
-                    ls_attendance_col = ls_attendance_col[0] if ls_attendance_col else None
-                    
-                if aww_attendance_col not in state_data.columns:
-                    aww_attendance_col = [col for col in state_data.columns if '% AWW' in col and 'train' in col.lower()]
-                    aww_attendance_col = aww_attendance_col[0] if aww_attendance_col else None
-                
-                # Extract the values from comparison_df for Cycle 1 since they're cleaner
-                with metrics_col1:
-                    try:
-                        dpo_value = comparison_cleaned.loc[0, 'Cycle 1']
-                        st.metric("DPO/DWCDO Workshop Attendance", f"{dpo_value}%")
-                    except:
-                        st.metric("DPO/DWCDO Workshop Attendance", "N/A")
-                        
-                with metrics_col2:
-                    try:
-                        cdpo_value = comparison_cleaned.loc[3, 'Cycle 1']
-                        st.metric("CDPO Training Attendance", f"{cdpo_value}%")
-                    except:
-                        st.metric("CDPO Training Attendance", "N/A")
-                        
-                with metrics_col3:
-                    try:
-                        # Find LS attendance in comparison data
-                        ls_rows = comparison_cleaned[comparison_cleaned['Questions'].str.contains('LS', na=False, case=False)]
-                        if not ls_rows.empty:
-                            ls_value = ls_rows.iloc[0]['Cycle 1']
-                            st.metric("LS Training Attendance", f"{ls_value}%")
-                        else:
-                            st.metric("LS Training Attendance", "N/A")
-                    except:
-                        st.metric("LS Training Attendance", "N/A")
-                        
-                with metrics_col4:
-                    try:
-                        # Find AWW attendance in comparison data
-                        aww_rows = comparison_cleaned[comparison_cleaned['Questions'].str.contains('AWW', na=False, case=False)]
-                        if not aww_rows.empty:
-                            aww_value = aww_rows.iloc[0]['Cycle 1']
-                            st.metric("AWW Training Attendance", f"{aww_value}%")
-                        else:
-                            st.metric("AWW Training Attendance", "N/A")
-                    except:
-                        st.metric("AWW Training Attendance", "N/A")
-            
-            # Create a bar chart for key metrics from comparison data
-            st.subheader("Implementation Metrics - Cycle 1")
-            
-            # Clean questions for better display
-            comparison_cleaned['Questions'] = comparison_cleaned['Questions'].astype(str)
-            comparison_cleaned['Questions'] = comparison_cleaned['Questions'].str.replace('%', '')
-            comparison_cleaned['Questions'] = comparison_cleaned['Questions'].str.replace('/', '-')
-            
-            # Create bar chart
-            try:
-                fig = px.bar(
-                    comparison_cleaned, 
-                    x='Questions', 
-                    y='Cycle 1',
-                    labels={'Questions': 'Metric', 'Cycle 1': 'Percentage (%)'},
-                    title='Cycle 1 Implementation Metrics',
-                    color='Cycle 1',
-                    color_continuous_scale=px.colors.sequential.Blues
-                )
-                fig.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
-            except Exception as e:
-                st.error(f"Error creating bar chart: {e}")
-                st.write("Raw data:")
-                st.dataframe(comparison_cleaned)
-
-        # Tab 2: District Performance
-        with tab2:
-            st.header("District Performance Analysis")
-            
-            # Filter state data to get district-level data
-            district_data = None
-            
-            try:
-                # Find district column and filter out headers
-                district_col = "Unnamed: 3"  # This is the column name from the original analysis
-                if district_col in cycle1_state_df.columns:
-                    district_data = cycle1_state_df[cycle1_state_df[district_col].notna() & 
-                                                  (cycle1_state_df[district_col] != 'District')]
-                    target_cols = [district_col, 'Unnamed: 10', 'Unnamed: 15', 'Unnamed: 22', 'Unnamed: 27']
-                    available_cols = [col for col in target_cols if col in cycle1_state_df.columns]
-                    
-                    if len(available_cols) > 1:  # At least district column + one metric
-                        district_data = district_data[available_cols]
-                        district_data.columns = ['District'] + [f'Metric {i}' for i in range(len(available_cols)-1)]
-                    else:
-                        st.error("Could not find enough metric columns in the data")
-                        district_data = None
-                else:
-                    st.error(f"District column '{district_col}' not found")
-                    # Show available columns
-                    st.write("Available columns:")
-                    st.write(cycle1_state_df.columns.tolist())
-            except Exception as e:
-                st.error(f"Could not extract district data from the Excel file: {e}")
-            
-            if district_data is not None and not district_data.empty:
-                # Display district data table
-                st.subheader("District Performance Table")
-                st.dataframe(district_data, use_container_width=True)
-                
-                # Create district comparison chart
-                st.subheader("District Performance Comparison")
-                
-                # Allow user to select metrics to compare
-                metric_cols = district_data.columns[1:].tolist()
-                if metric_cols:
-                    selected_metrics = st.multiselect(
-                        "Select metrics to compare across districts",
-                        options=metric_cols,
-                        default=metric_cols[:min(2, len(metric_cols))]
-                    )
-                    
-                    if selected_metrics:
-                        try:
-                            # Prepare data for visualization
-                            plot_data = district_data.melt(
-                                id_vars=['District'],
-                                value_vars=selected_metrics,
-                                var_name='Metric',
-                                value_name='Percentage'
-                            )
-                            
-                            # Convert percentage to numeric
-                            plot_data['Percentage'] = pd.to_numeric(plot_data['Percentage'], errors='coerce')
-                            
-                            # Create grouped bar chart
-                            fig = px.bar(
-                                plot_data,
-                                x='District',
-                                y='Percentage',
-                                color='Metric',
-                                barmode='group',
-                                title='District Performance by Key Metrics',
-                                labels={'Percentage': 'Percentage (%)', 'District': 'District Name'}
-                            )
-                            fig.update_layout(xaxis_tickangle=-45)
-                            st.plotly_chart(fig, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Error creating district comparison chart: {e}")
-                            st.write("Raw data:")
-                            st.dataframe(plot_data)
-
-        # Tab 3: Comparison Across Cycles
-        with tab3:
-            st.header("Comparison Across Implementation Cycles")
-            
-            # Display comparison data
-            st.subheader("Cycle Comparison Data")
-            st.dataframe(comparison_cleaned, use_container_width=True)
-            
-            # Create line chart to compare metrics across cycles
-            st.subheader("Trends Across Implementation Cycles")
-            
-            # Allow user to select metrics to compare
-            if 'Questions' in comparison_cleaned.columns:
-                question_options = comparison_cleaned['Questions'].dropna().astype(str).tolist()
-                
-                if question_options:
-                    selected_questions = st.multiselect(
-                        "Select metrics to compare across cycles",
-                        options=question_options,
-                        default=question_options[:min(3, len(question_options))]
-                    )
-                    
-                    if selected_questions:
-                        try:
-                            # Filter data based on selection
-                            filtered_data = comparison_cleaned[comparison_cleaned['Questions'].isin(selected_questions)]
-                            
-                            # Identify cycle columns
-                            cycle_cols = [col for col in comparison_cleaned.columns 
-                                          if col.startswith('Cycle') and col != 'Questions']
-                            
-                            if cycle_cols:
-                                # Prepare data for line chart
-                                plot_data = filtered_data.melt(
-                                    id_vars=['Questions'],
-                                    value_vars=cycle_cols,
-                                    var_name='Cycle',
-                                    value_name='Percentage'
-                                )
-                                
-                                # Create line chart
-                                fig = px.line(
-                                    plot_data,
-                                    x='Cycle',
-                                    y='Percentage',
-                                    color='Questions',
-                                    markers=True,
-                                    labels={'Percentage': 'Percentage (%)', 'Cycle': 'Implementation Cycle'},
-                                    title='Implementation Metrics Across Cycles'
-                                )
-                                st.plotly_chart(fig, use_container_width=True)
-                            else:
-                                st.error("No cycle columns found in the data")
-                        except Exception as e:
-                            st.error(f"Error creating cycle comparison chart: {e}")
-                            st.write("Raw data for debugging:")
-                            st.dataframe(filtered_data)
-                else:
-                    st.error("No question options found in the data")
-            else:
-                st.error("'Questions' column not found in comparison data")
+    # Start loading every sheet; the selected view renders as soon as its own sheets are in
+    if shared_data is not None:
+        loads = {
+            "Cycle 1": parallel_loader.completed(shared_data.cycle1_df),
+            "Cycle 1 State DPM wise status": parallel_loader.completed(shared_data.cycle1_state_df),
+            "Comparison Graph": parallel_loader.completed(shared_data.comparison_df),
+            DISTRICT_TABLE: parallel_loader.completed(shared_data.district_index),
+        }
+        record_loads = []
     else:
+        # The parse tasks time themselves; their records are added once they finish
+        loads, record_loads = start_loads(cycle1_file, cycle1_digest, comparison_file, comparison_digest)
+
+    # Show one view at a time; unlike st.tabs, the hidden views don't compute
+    view = st.radio("View", VIEWS, horizontal=True, key="view", label_visibility="collapsed")
+    progress = st.empty()
+    stages.call("wait_view_data", wait_for, loads, VIEW_LOADS[view], progress)
+
+    load_error = next((load.exception() for load in
+                       (loads[name] for name in VIEW_LOADS[view] if name != DISTRICT_TABLE)
+                       if load.exception() is not None), None)
+    if view == "District Performance":
+        render_district_performance(loads[DISTRICT_TABLE], cycle1_digest)
+    elif load_error is not None:
+        st.error(f"Error loading data: {load_error}")
         st.error("Error loading the data files. Please check the format and try again.")
+    else:
+        # Clean comparison data (cached per workbook hash; done once by the shared service)
+        if shared_data is not None:
+            comparison_cleaned = shared_data.comparison_cleaned
+        else:
+            comparison_cleaned = stages.call(
+                "clean_comparison", clean_comparison_data, comparison_digest, loads["Comparison Graph"].result()
+            )
+        if view == "Implementation Overview":
+            render_overview(comparison_cleaned, comparison_digest)
+        else:
+            render_cycle_comparison(comparison_cleaned, comparison_digest)
+
+    # The other sheets keep loading while the view is on screen
+    stages.call("wait_other_data", wait_for, loads, list(loads), progress)
+    progress.empty()
+    finished = {name: load.result() for name, load in loads.items() if load.exception() is None}
+    for record_load in record_loads:
+        if record_load.exception() is None:
+            stages.add(record_load.result(), finished)
+
+    # Report values that didn't fit their column's inferred type
+    with st.sidebar.expander("Data quality report"):
+        for sheet_name in ["Cycle 1", "Cycle 1 State DPM wise status", "Comparison Graph"]:
+            if loads[sheet_name].exception() is not None:
+                st.markdown(f"**{sheet_name}** - could not be loaded: {loads[sheet_name].exception()}")
+                continue
+            failures = loads[sheet_name].result().attrs.get('coercion_failures', {})
+            if failures:
+                st.markdown(f"**{sheet_name}** - values not converted to the column type:")
+                st.dataframe(pd.DataFrame([
+                    {'Column': col, 'Count': info['count'], 'Examples': ", ".join(info['examples'])}
+                    for col, info in failures.items()
+                ]), use_container_width=True)
 else:
     st.info("Please upload both files to view the dashboard.")
 
+# Rendering details for the charts drawn in this run
+with st.sidebar.expander("Chart rendering debug"):
+    st.write(f"WebGL threshold: {dashboard_figures.WEBGL_THRESHOLD} plotted rows")
+    st.write(f"District chart limit: {dashboard_data.CHART_DISTRICT_LIMIT} districts")
+    if rendered_charts:
+        st.dataframe(pd.DataFrame(rendered_charts), use_container_width=True)
+
+# Time from run_dashboard.py's launch to the end of the first script run,
+# reported once per server process
+@st.cache_resource
+def first_render_seconds(launch_time):
+    elapsed = time.time() - float(launch_time)
+    print(f"First render finished {elapsed:.2f}s after launch")
+    return elapsed
+
+launch_time = os.environ.get("LNC_LAUNCH_TIME")
+startup_seconds = first_render_seconds(launch_time) if launch_time else None
+
+# Per-stage duration, cache hit/miss and DataFrame memory for this run
+with st.sidebar.expander("Stage timings"):
+    st.checkbox("Record stage timings", value=instrumentation.ENABLED, key="instrument")
+    if startup_seconds is not None:
+        st.caption(f"First render: {startup_seconds:.2f}s after launch")
+    if stages.enabled:
+        st.dataframe(stages.table(), use_container_width=True)
+        if stages.log_path:
+            st.caption(f"Appended to {stages.log_path}")
+        # The shared default data is loaded outside this run, so its build is listed separately
+        if shared_data is not None:
+            st.caption("Shared default data, built at "
+                       f"{time.strftime('%H:%M:%S', time.localtime(shared_data.loaded_at))}:")
+            st.dataframe(pd.DataFrame(shared_data.stage_records, columns=stages.table().columns),
+                         use_container_width=True)
+stages.write_log(view=st.session_state.get("view"))
+
 # Footer
 st.markdown("---")
 st.markdown("**LNC Implementation Dashboard** | Created on: April 2025")
@@ -0,0 +1,150 @@
+"""Declarative metric definitions and cached header resolution.
+
+Each Metric lists the labels it goes by in the workbooks (the Comparison
+Graph question and the State DPM wise status column).  ``resolve`` maps a
+set of definitions onto one layout's headers: exact matches after
+normalization first, then the closest fuzzy match above FUZZY_CUTOFF among
+the headers that name the metric's role (DPO, CDPO, LS, AWW).  The
+result is cached by a fingerprint of the headers, so every workbook with
+the same layout reuses it and a lookup is a dict access.  Fuzzy matches and
+metrics with no match are reported instead of silently picking the wrong
+row when a new cycle's layout shifts.
+"""
+import difflib
+import hashlib
+import os
+import re
+import threading
+
+# Minimum difflib similarity (0-1) for a fuzzy header match
+FUZZY_CUTOFF = float(os.environ.get("LNC_METRIC_MATCH_CUTOFF", "0.8"))
+
+# Words that don't tell metrics apart ("% of LS ..." vs "% LS ...")
+_FILLER_WORDS = {'of', 'the'}
+
+
+class Metric:
+    """A metric the dashboard looks up by meaning rather than by position.
+
+    ``role`` is the word a header must contain to be a fuzzy match, so
+    "CDPOs Attended Workshop" can't be taken for the LS metric just because
+    the rest of the wording is closer.
+    """
+
+    def __init__(self, key, label, aliases, role=None):
+        self.key = key
+        self.label = label
+        self.aliases = list(aliases)
+        self.role = role
+
+    def __repr__(self):
+        return f"Metric({self.key!r})"
+
+
+# Headline values of the Implementation Overview
+OVERVIEW_METRICS = [
+    Metric('dpo_workshop', "DPO/DWCDO Workshop Attendance",
+           ["DPOs/ DWCDOs Attended Central Workshop", "% DPOs/ DWCDOs attended central workshop"], role='dpo'),
+    Metric('cdpo_training', "CDPO Training Attendance",
+           ["CDPOs Attended Training", "% of CDPOs Attended workshop"], role='cdpo'),
+    Metric('ls_training', "LS Training Attendance",
+           ["LS Attended Workshop", "% of LS attended workshop"], role='ls'),
+    Metric('aww_training', "AWW Training Attendance",
+           ["AWWs received Training", "% of AWWs received training"], role='aww'),
+]
+
+
+def normalize(label):
+    """Lower-case words of a label without punctuation or filler words.
+
+    '%' is kept as the word 'percent', so "% of LS attended" and "No. of LS
+    attended" stay apart.
+    """
+    words = re.sub(r'[^0-9a-z]+', ' ', str(label).lower().replace('%', ' percent ')).split()
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def names_role(label, role):
+    """True if a normalized label contains the role word, singular or plural ('cdpo', 'cdpos')"""
+    words = label.split()
+    return role in words or role + 's' in words
+
+
+def fingerprint(headers):
+    """Hash identifying a header layout (order and normalized labels)"""
+    return hashlib.sha1("\x1f".join(normalize(header) for header in headers).encode('utf-8')).hexdigest()
+
+
+class Resolution:
+    """Where each metric sits in one header layout"""
+
+    def __init__(self, headers, metrics, cutoff):
+        self.headers = list(headers)
+        self.metrics = {metric.key: metric for metric in metrics}
+        self.positions = {}
+        self.fuzzy = {}
+        self.missing = []
+
+        normalized = [normalize(header) for header in self.headers]
+        exact = {}
+        for position, label in enumerate(normalized):
+            exact.setdefault(label, position)
+
+        # Exact matches first, so a fuzzy match can't take a header another metric names exactly
+        unresolved = []
+        for metric in metrics:
+            position = next((exact[normalize(alias)] for alias in metric.aliases
+                             if normalize(alias) in exact), None)
+            if position is None:
+                unresolved.append(metric)
+            else:
+                self.positions[metric.key] = position
+
+        for metric in unresolved:
+            claimed = set(self.positions.values())
+            best = None
+            for alias in metric.aliases:
+                alias = normalize(alias)
+                for position, label in enumerate(normalized):
+                    if position in claimed or (metric.role and not names_role(label, metric.role)):
+                        continue
+                    score = difflib.SequenceMatcher(None, alias, label).ratio()
+                    if score >= cutoff and (best is None or score > best[1]):
+                        best = (position, score)
+            if best is None:
+                self.missing.append(metric.key)
+            else:
+                self.positions[metric.key] = best[0]
+                self.fuzzy[metric.key] = round(best[1], 2)
+
+    def header(self, key):
+        """Header matched to a metric, or None"""
+        position = self.positions.get(key)
+        return None if position is None else self.headers[position]
+
+    def mismatches(self):
+        """Human-readable notes on fuzzy and missing matches"""
+        notes = [f"{self.metrics[key].label}: matched '{self.header(key)}' (similarity {score:.2f})"
+                 for key, score in self.fuzzy.items()]
+        notes += [f"{self.metrics[key].label}: no match for {self.metrics[key].aliases}"
+                  for key in self.missing]
+        return notes
+
+
+# Resolutions by (header fingerprint, metric keys, cutoff), shared by every session
+_resolutions = {}
+_lock = threading.Lock()
+
+
+def resolve(headers, metrics=None, cutoff=None):
+    """Resolution of ``metrics`` (default OVERVIEW_METRICS) against a header layout, cached by fingerprint"""
+    metrics = OVERVIEW_METRICS if metrics is None else metrics
+    cutoff = FUZZY_CUTOFF if cutoff is None else cutoff
+    headers = [str(header) for header in headers]
+    key = (fingerprint(headers), tuple(metric.key for metric in metrics), cutoff)
+    resolution = _resolutions.get(key)
+    if resolution is None:
+        resolution = Resolution(headers, metrics, cutoff)
+        with _lock:
+            _resolutions[key] = resolution
+    return resolution
@@ -0,0 +1,225 @@
+"""Typed output backends for read_excel_files.
+
+Besides the legacy CSV + text dump, sheets can be written as Parquet or
+Feather (Arrow IPC) files, or appended to a SQLite/DuckDB store with one
+table per sheet.  Every typed output carries ``cycle``, ``source_file`` and
+``source_path`` columns so cycle-over-cycle queries can read the typed
+columns directly.
+"""
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+import dpm_sheet
+import type_inference
+import workbook_loader
+
+FILE_FORMATS = ('csv', 'parquet', 'feather')
+STORE_FORMATS = ('sqlite', 'duckdb')
+OUTPUT_FORMATS = FILE_FORMATS + STORE_FORMATS
+
+DEFAULT_COMPRESSION = {'parquet': 'snappy', 'feather': 'lz4'}
+STORE_FILE_NAMES = {'sqlite': 'lnc_sheets.sqlite', 'duckdb': 'lnc_sheets.duckdb'}
+
+
+def cycle_from_name(file_path):
+    """Guess the cycle label ('Cycle 2', 'Cycle 2.1', ...) from a workbook file name"""
+    match = re.search(r'cycle\s*(\d+(?:\.\d+)?)', os.path.basename(file_path), re.IGNORECASE)
+    return f"Cycle {match.group(1)}" if match else None
+
+
+def table_name(sheet_name):
+    """Turn a sheet name into a safe table/file name, e.g. 'cycle_1_state_dpm_wise_status'"""
+    return re.sub(r'[^0-9a-zA-Z]+', '_', sheet_name).strip('_').lower() or 'sheet'
+
+
+def name_dpm_columns(df):
+    """Name the DPM wise status columns after their header labels and drop the header rows above the data.
+
+    Left unnamed, the labels sit in rows under "Unnamed: N" columns and the
+    numeric columns would turn them into missing values.
+    """
+    try:
+        label_row, names = dpm_sheet.resolve_header(df)
+    except ValueError:
+        return df
+    df = df.iloc[label_row + 1:].reset_index(drop=True)
+    df.columns = [names.get(position, col) for position, col in enumerate(df.columns)]
+    return df
+
+
+def read_typed_sheets(file_path, streaming=None, cycle=None):
+    """Read every sheet with inferred dtypes plus cycle/source_file/source_path columns.
+
+    Values that don't fit their column's type are stored as missing and
+    reported on stdout.
+    """
+    if cycle is None:
+        cycle = cycle_from_name(file_path)
+    sheets = {}
+    for name, df in workbook_loader.read_workbook(file_path, dtype=str, streaming=streaming).items():
+        if dpm_sheet.find_sheet_name([name]):
+            df = name_dpm_columns(df)
+        df, failures = type_inference.convert_types(df)
+        if failures:
+            examples = [example for info in failures.values() for example in info['examples']]
+            print(f"{os.path.basename(file_path)} / {name}: "
+                  f"{sum(info['count'] for info in failures.values())} value(s) in {len(failures)} "
+                  f"numeric column(s) are not numbers and were stored as missing, e.g. {examples[:3]}")
+        # Columnar formats need string column names
+        df.columns = [str(col) for col in df.columns]
+        # Explicit string dtype keeps the column textual even when no cycle is known
+        df['cycle'] = pd.Series(cycle, index=df.index, dtype='string')
+        df['source_file'] = pd.Series(os.path.basename(file_path), index=df.index, dtype='string')
+        # Full path: workbooks with the same name from different folders are different sources
+        df['source_path'] = pd.Series(os.path.abspath(file_path), index=df.index, dtype='string')
+        sheets[name] = df
+    return sheets
+
+
+def write_files(sheets, output_dir, file_name, output_format, compression=None):
+    """Write one Parquet/Feather file per sheet; returns the written paths"""
+    if compression is None:
+        compression = DEFAULT_COMPRESSION.get(output_format)
+    paths = []
+    for sheet_name, df in sheets.items():
+        path = os.path.join(output_dir, f"{file_name}_{table_name(sheet_name)}.{output_format}")
+        if output_format == 'parquet':
+            df.to_parquet(path, index=False, compression=compression)
+        elif output_format == 'feather':
+            df.reset_index(drop=True).to_feather(path, compression=compression)
+        else:
+            raise ValueError(f"Unsupported file format: {output_format}")
+        paths.append(path)
+    return paths
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SheetStore:
+    """Appendable SQLite or DuckDB store with one table per sheet.
+
+    Re-ingesting a workbook replaces its earlier rows (matched on
+    ``source_path``; rows from before that column existed are matched on
+    ``source_file``), and columns that appear in a newer layout are added to
+    the existing table.  Only one process should write to a store at a time.
+    """
+
+    def __init__(self, path, kind='sqlite'):
+        if kind not in STORE_FORMATS:
+            raise ValueError(f"Unsupported store format: {kind}")
+        self.kind = kind
+        self.path = path
+        if kind == 'duckdb':
+            try:
+                import duckdb
+            except ImportError:
+                raise ImportError("The duckdb output format requires the 'duckdb' package") from None
+            self.connection = duckdb.connect(path)
+        else:
+            self.connection = sqlite3.connect(path)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _columns(self, table):
+        if self.kind == 'duckdb':
+            rows = self.connection.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = ?", [table]
+            ).fetchall()
+            return [row[0] for row in rows]
+        return [row[1] for row in self.connection.execute(f"PRAGMA table_info({_quote(table)})")]
+
+    def append(self, sheets):
+        """Append typed sheets from one workbook in one transaction; returns the number of rows written"""
+        # Categorical columns would become DuckDB ENUMs limited to the first
+        # workbook's labels, so both stores get them as plain strings
+        tables = {
+            table_name(sheet_name): df.astype({col: 'string' for col in df.columns
+                                               if isinstance(df[col].dtype, pd.CategoricalDtype)})
+            for sheet_name, df in sheets.items()
+        }
+        if self.kind == 'duckdb':
+            self.connection.begin()
+            try:
+                for table, df in tables.items():
+                    self._append_duckdb(table, df)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+        else:
+            for table, df in tables.items():
+                self._create_sqlite(table, df)
+            # The old rows of every sheet are replaced together or not at all
+            with self.connection:
+                for table, df in tables.items():
+                    self._append_sqlite(table, df)
+        return sum(len(df) for df in tables.values())
+
+    def _create_sqlite(self, table, df):
+        """Create the table, or add columns a newer layout brings, before the data transaction"""
+        existing = self._columns(table)
+        if not existing:
+            df.head(0).to_sql(table, self.connection, index=False)
+            return
+        for col in df.columns:
+            if col not in existing:
+                self.connection.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)}")
+        self.connection.commit()
+
+    def _append_sqlite(self, table, df):
+        sources = df[['source_path', 'source_file']].dropna().drop_duplicates()
+        self.connection.executemany(
+            f"DELETE FROM {_quote(table)} WHERE source_path = ? "
+            f"OR (source_path IS NULL AND source_file = ?)",
+            list(sources.itertuples(index=False, name=None))
+        )
+        # sqlite3 can't bind nullable extension values directly
+        plain = df.astype(object).where(df.notna(), None)
+        columns = ", ".join(_quote(col) for col in df.columns)
+        self.connection.executemany(
+            f"INSERT INTO {_quote(table)} ({columns}) VALUES ({', '.join('?' for _ in df.columns)})",
+            plain.itertuples(index=False, name=None)
+        )
+
+    def _append_duckdb(self, table, df):
+        self.connection.register('incoming_sheet', df)
+        try:
+            existing = self._columns(table)
+            if not existing:
+                self.connection.execute(
+                    f"CREATE TABLE {_quote(table)} AS SELECT * FROM incoming_sheet WHERE false"
+                )
+            else:
+                for col in df.columns:
+                    if col not in existing:
+                        column_type = self.connection.execute(
+                            f"SELECT typeof({_quote(col)}) FROM incoming_sheet LIMIT 1"
+                        ).fetchone()
+                        column_type = column_type[0] if column_type else 'VARCHAR'
+                        self.connection.execute(
+                            f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)} {column_type}"
+                        )
+                self.connection.execute(
+                    f"DELETE FROM {_quote(table)} WHERE source_path IN "
+                    f"(SELECT DISTINCT source_path FROM incoming_sheet) "
+                    f"OR (source_path IS NULL AND source_file IN "
+                    f"(SELECT DISTINCT source_file FROM incoming_sheet))"
+                )
+            columns = ", ".join(_quote(col) for col in df.columns)
+            self.connection.execute(
+                f"INSERT INTO {_quote(table)} ({columns}) SELECT {columns} FROM incoming_sheet"
+            )
+        finally:
+            self.connection.unregister('incoming_sheet')
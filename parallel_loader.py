@@ -0,0 +1,163 @@
+"""Concurrent parsing of the dashboard's workbooks.
+
+Each workbook is parsed as its own task in a shared thread pool, so the
+Cycle 1 and Comparison workbooks load side by side instead of one after the
+other.  Within a workbook the sheets are still read in one pass: opening the
+workbook again per sheet costs more than it saves, since openpyxl holds the
+GIL.  The same pass also feeds the district table, so the DPM wise status
+sheet is read once.  Every sheet gets its own future; the dashboard waits only
+for the ones the selected view needs and picks up the rest as they finish.
+
+Threads rather than processes: Streamlit runs the dashboard as ``__main__``,
+so spawned worker processes (the only kind on Windows) would re-run the whole
+script.  Fully cached workbooks are read in the calling thread, and a task
+that is in flight is shared by every session asking for it.
+
+Tasks time their own stages (load_data, district_extraction) and return the
+records under STAGE_RECORDS, so a session's stage timings show the parse
+itself rather than the submit or the wait.
+"""
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import dpm_sheet
+import instrumentation
+import sheet_cache
+import uploads
+import workbook_loader
+
+# Parser threads ("0" parses in the calling thread)
+MAX_WORKERS = int(os.environ.get("LNC_PARSE_WORKERS", "4"))
+# Finished results kept in memory, so reruns reuse the same frames
+MAX_FINISHED = 16
+# Result name of the DistrictIndex in a workbook task
+DISTRICT_INDEX = "District table"
+# Result name of a workbook task's stage records (see instrumentation.stage_record)
+STAGE_RECORDS = "Stage records"
+
+
+def _uncached(digest, sheet_names, district_sheet):
+    """Sheets that still have to be read from the workbook"""
+    uncached = [name for name in sheet_names if not sheet_cache.has_sheet(digest, name)]
+    if (district_sheet is not None and district_sheet not in uncached
+            and not sheet_cache.has_sheet(digest, dpm_sheet.DISTRICT_METRICS_KEY)):
+        uncached.append(district_sheet)
+    return uncached
+
+
+def parse_workbook(source, digest, sheet_names, district_sheet=None, streaming=None):
+    """Task body: type-converted sheets of one workbook, plus its DistrictIndex.
+
+    Returns a dict keyed by sheet name (and DISTRICT_INDEX when
+    ``district_sheet`` is given), plus the task's STAGE_RECORDS.  Uncached
+    sheets are read in one pass.
+    """
+    uncached = _uncached(digest, sheet_names, district_sheet)
+    # In memory-bounded mode a parse waits for a free slot; cache-only reads don't need one
+    with uploads.parse_slot() if uncached else contextlib.nullcontext():
+        start = time.perf_counter()
+        raw = workbook_loader.read_workbook(source, uncached, dtype=str, streaming=streaming) if uncached else {}
+        results = workbook_loader.load_sheets(source, digest, sheet_names, streaming=streaming, raw=raw)
+        workbook_name = os.path.basename(getattr(source, 'name', None) or str(source))
+        records = [instrumentation.stage_record(
+            f"load_data: {workbook_name}", start,
+            'miss' if any(name in uncached for name in sheet_names) else 'hit', sheet_names
+        )]
+        if district_sheet is not None:
+            start = time.perf_counter()
+            cached = sheet_cache.has_sheet(digest, dpm_sheet.DISTRICT_METRICS_KEY)
+            results[DISTRICT_INDEX] = dpm_sheet.load_district_index(
+                source, digest, district_sheet, streaming=streaming, raw=raw.get(district_sheet)
+            )
+            records.append(instrumentation.stage_record(
+                "district_extraction", start, 'hit' if cached else 'miss', [DISTRICT_INDEX]
+            ))
+        results[STAGE_RECORDS] = records
+        return results
+
+
+def completed(value):
+    """A future that already holds ``value``"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _pick(task, name):
+    """Future for one entry of a workbook task's result"""
+    future = Future()
+
+    def resolve(task):
+        if task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result()[name])
+    task.add_done_callback(resolve)
+    return future
+
+
+def _run(future, func, *args):
+    """Run func in the calling thread and settle future with its result"""
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+
+
+class SheetLoader:
+    """Thread pool plus a registry of in-flight and recently finished tasks"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = MAX_WORKERS if max_workers is None else max_workers
+        self._executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="lnc-parse"
+        ) if self.max_workers > 0 else None
+        self._tasks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def workbook(self, source, digest, sheet_names, district_sheet=None, streaming=None):
+        """Futures for one workbook's sheets, keyed by sheet name (plus DISTRICT_INDEX and STAGE_RECORDS)"""
+        sheet_names = tuple(sheet_names)
+        key = (digest, sheet_names, district_sheet, streaming)
+        args = (source, digest, sheet_names, district_sheet, streaming)
+        reused = False
+        run_here = None
+        with self._lock:
+            task = self._tasks.get(key)
+            # Failed tasks are retried on the next request
+            if task is None or (task.done() and task.exception() is not None):
+                if self._executor is not None and _uncached(digest, sheet_names, district_sheet):
+                    task = self._executor.submit(parse_workbook, *args)
+                else:
+                    # Registered now, run below: parse_workbook may wait for a
+                    # parse slot, which must not happen while holding the lock
+                    task = run_here = Future()
+                self._tasks[key] = task
+                self._trim()
+            else:
+                reused = task.done()
+                self._tasks.move_to_end(key)
+        if run_here is not None:
+            _run(run_here, parse_workbook, *args)
+        names = list(sheet_names) + ([DISTRICT_INDEX] if district_sheet is not None else [])
+        futures = {name: _pick(task, name) for name in names}
+        if reused:
+            # This request reused a finished parse, so none of its stages ran again
+            futures[STAGE_RECORDS] = completed([dict(record, cache='hit', duration_ms=0.0)
+                                                for record in task.result()[STAGE_RECORDS]])
+        else:
+            futures[STAGE_RECORDS] = _pick(task, STAGE_RECORDS)
+        return futures
+
+    def _trim(self):
+        finished = [key for key, future in self._tasks.items() if future.done()]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self._tasks[key]
@@ -1,9 +1,21 @@
-import pandas as pd
+import argparse
+import glob
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def read_excel_file(file_path, output_dir):
+import output_backends
+import sheet_cache
+import workbook_loader
+
+# Records mtime and content hash of every processed workbook in the output directory
+MANIFEST_NAME = ".read_excel_manifest.json"
+
+def read_excel_file(file_path, output_dir, streaming=None, file_name=None):
     # Get the file name without extension
-    file_name = os.path.basename(file_path).split('.')[0]
+    file_name = file_name or output_name(file_path)
     output_file = os.path.join(output_dir, f"{file_name}_analysis.txt")
     
     # Open a file to write the output
@@ -11,20 +23,20 @@ def read_excel_file(file_path, output_dir):
         f.write(f"Reading: {file_path}\n")
         f.write("-" * 80 + "\n")
         
-        # Read all sheets in the Excel file
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
+        # Read all sheets in the Excel file in a single pass
+        sheets = workbook_loader.read_workbook(file_path, streaming=streaming)
+        sheet_names = list(sheets)
         
         f.write(f"The file contains {len(sheet_names)} sheet(s): {sheet_names}\n\n")
         
         # Read each sheet and display its content
-        for sheet_name in sheet_names:
+        total_rows = 0
+        paths = [output_file]
+        for sheet_name, df in sheets.items():
+            total_rows += len(df)
             f.write(f"Sheet: {sheet_name}\n")
             f.write("-" * 40 + "\n")
             
-            # Read the sheet
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-            
             # Display basic info
             f.write(f"Dimensions: {df.shape[0]} rows × {df.shape[1]} columns\n")
             f.write(f"Column names: {list(df.columns)}\n\n")
@@ -32,6 +44,7 @@ def read_excel_file(file_path, output_dir):
             # Save the data to a CSV file for easier viewing
             csv_file = os.path.join(output_dir, f"{file_name}_{sheet_name}.csv")
             df.to_csv(csv_file, index=False)
+            paths.append(csv_file)
             f.write(f"Saved sheet data to: {csv_file}\n")
             
             # Display first 5 rows of data
@@ -47,21 +60,204 @@ def read_excel_file(file_path, output_dir):
     
     print(f"Analysis for {file_name} saved to {output_file}")
     print(f"CSV files for each sheet saved in {output_dir}")
+    return total_rows, paths
+
+def find_workbooks(inputs):
+    """Expand directories, glob patterns and file paths into a sorted list of workbooks"""
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "*.xlsx"))
+        else:
+            matches = glob.glob(item)
+        for path in matches:
+            # Skip Excel's "~$" lock files for workbooks that are open
+            if os.path.isfile(path) and not os.path.basename(path).startswith("~$"):
+                files.add(os.path.abspath(path))
+    return sorted(files)
+
+
+def output_name(file_path):
+    """Output file prefix for a workbook: its name without the extension"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def output_names(files, manifest=None):
+    """Stable, unique output prefix per workbook path.
+
+    A workbook keeps the name recorded for it in the manifest.  A new
+    workbook whose name is already used by another path, in this batch or in
+    an earlier run, gets a short hash of its full path appended, so outputs
+    from different directories don't overwrite each other.
+    """
+    manifest = manifest or {}
+    claimed = {}
+    for path, entry in manifest.items():
+        claimed.setdefault(entry.get('name', output_name(path)), set()).add(path)
+
+    names = {path: manifest[path].get('name', output_name(path)) for path in files if path in manifest}
+    new = [path for path in files if path not in names]
+    counts = {}
+    for path in new:
+        counts[output_name(path)] = counts.get(output_name(path), 0) + 1
+    for path in new:
+        name = output_name(path)
+        if counts[name] > 1 or claimed.get(name, set()) - {path}:
+            name = f"{name}_{hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]}"
+        names[path] = name
+    return names
+
+
+def load_manifest(output_dir, name=MANIFEST_NAME):
+    try:
+        with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest, name=MANIFEST_NAME):
+    path = os.path.join(output_dir, name)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_unchanged(file_path, entry, output_format='csv'):
+    """Check a workbook against its manifest entry: outputs still on disk, then mtime, hash only if mtime moved"""
+    if not entry or entry.get('format', 'csv') != output_format:
+        return False
+    if not all(os.path.exists(path) for path in entry.get('outputs', [])):
+        return False
+    if os.path.getmtime(file_path) == entry.get('mtime'):
+        return True
+    if sheet_cache.file_digest(file_path) == entry.get('sha256'):
+        entry['mtime'] = os.path.getmtime(file_path)
+        return True
+    return False
+
+
+def process_file(file_path, output_dir, streaming=None, output_format='csv',
+                 compression=None, cycle=None, file_name=None):
+    """Worker entry point: analyse one workbook and return its manifest entry.
+
+    For store formats the typed sheets are returned under 'sheets' so the
+    parent process, the only writer, can append them to the store.
+    """
+    file_name = file_name or output_name(file_path)
+    mtime = os.path.getmtime(file_path)
+    digest = sheet_cache.file_digest(file_path)
+    entry = {'mtime': mtime, 'sha256': digest, 'format': output_format, 'name': file_name}
+
+    if output_format == 'csv':
+        entry['rows'], paths = read_excel_file(file_path, output_dir, streaming=streaming, file_name=file_name)
+        entry['outputs'] = [os.path.abspath(path) for path in paths]
+        return entry
+
+    sheets = output_backends.read_typed_sheets(file_path, streaming=streaming, cycle=cycle)
+    entry['rows'] = sum(len(df) for df in sheets.values())
+    if output_format in output_backends.STORE_FORMATS:
+        entry['sheets'] = sheets
+        store_path = os.path.join(output_dir, output_backends.STORE_FILE_NAMES[output_format])
+        entry['outputs'] = [os.path.abspath(store_path)]
+    else:
+        paths = output_backends.write_files(sheets, output_dir, file_name, output_format, compression)
+        entry['outputs'] = [os.path.abspath(path) for path in paths]
+        print(f"Saved {len(paths)} {output_format} file(s) for {file_name} in {output_dir}")
+    return entry
+
+
+def run_batch(inputs, output_dir, workers=None, streaming=None, force=False,
+              output_format='csv', compression=None, cycle=None):
+    """Analyse every workbook matched by inputs, fanning out over a process pool"""
+    os.makedirs(output_dir, exist_ok=True)
+    files = find_workbooks(inputs)
+    manifest = load_manifest(output_dir)
+    # Names are checked against the whole batch and the earlier runs in the manifest
+    names = output_names(files, manifest)
+
+    pending = [path for path in files
+               if force or not is_unchanged(path, manifest.get(path), output_format)]
+    skipped = len(files) - len(pending)
+    processed, failed, rows = 0, 0, 0
+
+    store = None
+    if output_format in output_backends.STORE_FORMATS:
+        store_path = os.path.join(output_dir, output_backends.STORE_FILE_NAMES[output_format])
+        store = output_backends.SheetStore(store_path, output_format)
+
+    start = time.perf_counter()
+    try:
+        # openpyxl parsing is CPU-bound and holds the GIL, so use processes rather than threads
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(process_file, path, output_dir, streaming,
+                                output_format, compression, cycle, names[path]): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    entry = future.result()
+                    sheets = entry.pop('sheets', None)
+                    if sheets is not None:
+                        store.append(sheets)
+                        print(f"Appended {len(sheets)} sheet(s) from {file_path} to {store.path}")
+                except Exception as e:
+                    failed += 1
+                    print(f"Error reading {file_path}: {str(e)}")
+                    continue
+                manifest[file_path] = entry
+                processed += 1
+                rows += entry['rows']
+                print("-" * 50)
+    finally:
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - start
+
+    save_manifest(output_dir, manifest)
+
+    print(f"Processed {processed} file(s), skipped {skipped} unchanged, {failed} failed "
+          f"in {elapsed:.2f}s")
+    if processed and elapsed > 0:
+        print(f"Throughput: {processed / elapsed:.2f} files/s, {rows / elapsed:.0f} rows/s")
+    return processed, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export every sheet of a batch of LNC workbooks to CSV, Parquet, "
+                    "Feather or a SQLite/DuckDB store"
+    )
+    parser.add_argument("inputs", nargs="+",
+                        help="Workbook files, directories of .xlsx files or glob patterns")
+    parser.add_argument("-o", "--output-dir", default="excel_analysis_output",
+                        help="Directory for the output files (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("-f", "--format", default="csv", choices=output_backends.OUTPUT_FORMATS,
+                        help="Output format: csv writes CSV plus a text summary; parquet/feather "
+                             "write typed files; sqlite/duckdb append to a store with one table "
+                             "per sheet (default: %(default)s)")
+    parser.add_argument("--compression", default=None,
+                        help="Compression codec for parquet (snappy, gzip, zstd, ...) or "
+                             "feather (lz4, zstd, uncompressed)")
+    parser.add_argument("--cycle", default=None,
+                        help="Cycle label for the cycle column (default: taken from the file name)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Parse sheets row by row in openpyxl read-only mode")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-process workbooks even if they are unchanged")
+    args = parser.parse_args(argv)
+
+    _, _, failed = run_batch(args.inputs, args.output_dir, workers=args.workers,
+                             streaming=args.streaming or None, force=args.force,
+                             output_format=args.format, compression=args.compression,
+                             cycle=args.cycle)
+    return 1 if failed else 0
+
 
 # Main execution
 if __name__ == "__main__":
-    files = [
-        r"f:\Projects\Excel Automation\Cycle 1 LNC Implementation  Analysis January 25.xlsx",
-        r"f:\Projects\Excel Automation\LNC Implementation Comparison Graph January 25.xlsx"
-    ]
-    
-    # Create output directory
-    output_dir = r"f:\Projects\Excel Automation\excel_analysis_output"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    for file_path in files:
-        try:
-            read_excel_file(file_path, output_dir)
-            print("-" * 50)
-        except Exception as e:
-            print(f"Error reading {file_path}: {str(e)}")
+    raise SystemExit(main())
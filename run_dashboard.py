@@ -1,31 +1,68 @@
+import hashlib
+import importlib.util
 import os
+import re
 import sys
 import subprocess
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_FILE = os.path.join(APP_DIR, "requirements.txt")
+# Written after a successful check; holds a hash of requirements.txt and the interpreter
+DEPS_MARKER = os.path.join(APP_DIR, ".lnc_deps_ok")
+
+
+def requirements_key():
+    """Identifies requirements.txt contents and the Python interpreter that was checked"""
+    with open(REQUIREMENTS_FILE, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return f"{digest} {sys.executable}"
+
+
+def required_modules():
+    """Import names of the packages listed in requirements.txt"""
+    modules = []
+    with open(REQUIREMENTS_FILE, encoding='utf-8') as f:
+        for line in f:
+            name = re.split(r'[<>=!~;\[\s]', line.split('#')[0].strip(), maxsplit=1)[0]
+            if name:
+                modules.append(name.lower().replace('-', '_'))
+    return modules
+
+
+def check_dependencies():
+    """Make sure the requirements are installed, without importing them.
+
+    The check is skipped while requirements.txt and the interpreter are the
+    same as at the last successful check; missing packages are installed once.
+    """
+    key = requirements_key()
+    if os.path.exists(DEPS_MARKER):
+        with open(DEPS_MARKER, encoding='utf-8') as f:
+            if f.read().strip() == key:
+                return
+
+    missing = [module for module in required_modules() if importlib.util.find_spec(module) is None]
+    if missing:
+        print(f"Installing missing packages: {', '.join(missing)}...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", REQUIREMENTS_FILE])
+        print("Packages installed successfully!")
+    with open(DEPS_MARKER, 'w', encoding='utf-8') as f:
+        f.write(key)
 
-def install_if_missing(package):
-    """Install a package if it's not already installed"""
-    try:
-        __import__(package)
-    except ImportError:
-        print(f"Installing {package}...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        print(f"{package} installed successfully!")
-
-# Install required packages if missing
-required_packages = ['streamlit', 'pandas', 'openpyxl', 'plotly']
-for package in required_packages:
-    install_if_missing(package)
-
-# Now that we're sure all packages are installed, import them
-import streamlit
-import pandas
-import plotly
 
 def main():
     """Run the Streamlit dashboard"""
-    print("Starting LNC Implementation Dashboard...")
-    dashboard_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lnc_dashboard.py")
-    subprocess.call([sys.executable, "-m", "streamlit", "run", dashboard_path])
+    launch_time = time.time()
+    check_dependencies()
+    print(f"Starting LNC Implementation Dashboard... (dependency check took {time.time() - launch_time:.2f}s)")
+    dashboard_path = os.path.join(APP_DIR, "lnc_dashboard.py")
+    # The dashboard reports its first render relative to this launch time
+    env = dict(os.environ, LNC_LAUNCH_TIME=str(launch_time))
+    # Let Streamlit reject uploads over the dashboard's own limit (see uploads.py)
+    max_upload_mb = os.environ.get("LNC_MAX_UPLOAD_MB", "200")
+    subprocess.call([sys.executable, "-m", "streamlit", "run", dashboard_path,
+                     "--server.maxUploadSize", str(int(float(max_upload_mb)))], env=env)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+"""Persistent Parquet cache for parsed workbook sheets.
+
+Each sheet is stored after parsing and type conversion, keyed by the SHA-256
+of the workbook contents.  The cache lives on disk, so it is shared by every
+Streamlit session and survives server restarts; a hit is a memory-mapped
+Parquet read instead of an openpyxl XML parse.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Caching is an optimisation only - without pyarrow every load parses the workbook
+    pa = pq = None
+
+CACHE_DIR = os.environ.get(
+    "LNC_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".lnc_cache")
+)
+MAX_CACHE_BYTES = int(float(os.environ.get("LNC_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# Bump whenever parsing or type conversion changes so old entries are ignored
+CACHE_VERSION = "3"
+
+CHUNK_SIZE = 1024 * 1024
+# Parquet schema metadata key holding an entry's JSON metadata
+METADATA_KEY = b"lnc_metadata"
+
+
+def file_digest(source):
+    """Return the SHA-256 hex digest of a file path or file-like object"""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    else:
+        position = source.tell()
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+        source.seek(position)
+    return digest.hexdigest()
+
+
+def _entry_path(digest, sheet_name):
+    sheet_key = re.sub(r'[^A-Za-z0-9]+', '_', sheet_name).strip('_')
+    return os.path.join(CACHE_DIR, f"v{CACHE_VERSION}-{digest}-{sheet_key}.parquet")
+
+
+def read_sheet(digest, sheet_name):
+    """Return the cached DataFrame for a sheet, or None on a cache miss"""
+    return read_entry(digest, sheet_name)[0]
+
+
+def read_entry(digest, sheet_name):
+    """Return ``(df, metadata)`` for a cached sheet, or ``(None, None)`` on a cache miss"""
+    if pq is None:
+        return None, None
+    path = _entry_path(digest, sheet_name)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        table = pq.read_table(path, memory_map=True)
+        metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+        df = table.to_pandas()
+    except Exception:
+        # Corrupt or unreadable entry - drop it and fall back to parsing
+        _remove(path)
+        return None, None
+    # Refresh mtime so eviction removes the least recently used entries first
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return df, metadata
+
+
+def has_sheet(digest, sheet_name):
+    """True if the sheet is in the cache (without reading it)"""
+    return pq is not None and os.path.exists(_entry_path(digest, sheet_name))
+
+
+def write_sheet(digest, sheet_name, df, metadata=None):
+    """Store a parsed sheet in the cache; returns True if it was written.
+
+    pandas does not keep ``DataFrame.attrs`` through Parquet, so anything
+    that has to survive the cache is passed as JSON-serializable
+    ``metadata`` and stored in the Parquet schema metadata.
+    """
+    if pq is None:
+        return False
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(digest, sheet_name)
+    # Write to a temp file and rename so concurrent sessions never read a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata or {}).encode('utf-8')
+        })
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        # Columns pyarrow cannot represent are simply not cached
+        _remove(tmp_path)
+        return False
+    evict()
+    return True
+
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        if not name.endswith(".parquet"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,111 @@
+"""Schema inference and batch type conversion for sheets read as strings.
+
+Each column is sampled once to pick a compact dtype - ``Int32``, ``float32``,
+percent strings parsed to ``float32``, ``category`` for repetitive labels such
+as state/district/DPM names - and the whole frame is then converted in one
+batch.  Values that don't fit the chosen type become missing and are reported
+per column instead of silently keeping the column as ``object``.
+"""
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZE = 500
+# Share of sampled values that must parse as numbers for a numeric column
+MIN_NUMERIC_RATIO = 0.8
+# Text columns with at most this share of distinct values become categorical
+CATEGORY_RATIO = 0.5
+# Number of offending values kept per column in the failure report
+MAX_FAILURE_EXAMPLES = 5
+# float32 keeps ~7 significant digits - enough for 4 decimals on percentages
+FLOAT32_DECIMALS = 4
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def parse_numbers(values):
+    """Vectorized string -> float parse that accepts '97.7%' and '1,424'"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+    text = values.astype(str).str.strip().str.replace(',', '', regex=False)
+    return pd.to_numeric(text.str.rstrip('%'), errors='coerce')
+
+
+def infer_schema(df, sample_size=SAMPLE_SIZE, min_numeric_ratio=MIN_NUMERIC_RATIO,
+                 category_ratio=CATEGORY_RATIO):
+    """Return a {column: dtype} mapping chosen from a sample of each column"""
+    schema = {}
+    for col in df.columns:
+        values = df[col].dropna()
+        if values.empty:
+            schema[col] = 'object'
+            continue
+        if len(values) > sample_size:
+            values = values.sample(sample_size, random_state=0)
+
+        numbers = parse_numbers(values)
+        parsed = numbers.notna()
+        if parsed.mean() >= min_numeric_ratio:
+            numbers = numbers[parsed]
+            is_percent = (not pd.api.types.is_numeric_dtype(values)
+                          and values.astype(str).str.strip().str.endswith('%').any())
+            whole = (numbers == numbers.round()).all()
+            in_range = numbers.between(INT32_MIN, INT32_MAX).all()
+            schema[col] = 'Int32' if whole and in_range and not is_percent else 'float32'
+        elif values.nunique() <= len(values) * category_ratio:
+            schema[col] = 'category'
+        else:
+            schema[col] = 'object'
+    return schema
+
+
+def convert_types(df, schema=None):
+    """Convert a frame to its inferred schema in one batch.
+
+    Returns ``(converted, failures)`` where ``failures`` maps each column with
+    values that could not be coerced to ``{'count': n, 'examples': [...]}``.
+    The failure report is also stored in ``converted.attrs['coercion_failures']``.
+    """
+    if schema is None:
+        schema = infer_schema(df)
+
+    columns = {}
+    failures = {}
+    for col in df.columns:
+        values = df[col]
+        dtype = schema.get(col, 'object')
+        if dtype in ('Int32', 'float32'):
+            numbers = parse_numbers(values)
+            failed = numbers.isna() & values.notna()
+            if failed.any():
+                failures[str(col)] = {
+                    'count': int(failed.sum()),
+                    'examples': [str(v) for v in values[failed].unique()[:MAX_FAILURE_EXAMPLES]],
+                }
+            # The schema only saw a sample: keep the column as float32 if any
+            # value outside it has a fraction or is out of range, rather than rounding it
+            parsed = numbers.dropna()
+            if dtype == 'Int32' and ((parsed != parsed.round()).any()
+                                     or not parsed.between(INT32_MIN, INT32_MAX).all()):
+                dtype = 'float32'
+            if dtype == 'Int32':
+                numbers = numbers.astype('Int32')
+            else:
+                numbers = numbers.astype('float32')
+            columns[col] = numbers
+        elif dtype == 'category':
+            columns[col] = values.astype('category')
+        else:
+            columns[col] = values
+
+    converted = pd.DataFrame(columns, index=df.index)
+    converted.attrs['coercion_failures'] = failures
+    return converted, failures
+
+
+def widen_floats(values, decimals=FLOAT32_DECIMALS):
+    """Return values as float64 with float32 representation noise rounded off.
+
+    Used before values are displayed, so 83.3 isn't shown as 83.30000305.
+    """
+    return pd.to_numeric(values, errors='coerce').astype('float64').round(decimals)
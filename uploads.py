@@ -0,0 +1,101 @@
+"""Spooling of uploaded workbooks to disk.
+
+An upload is copied to a temp file in chunks while its SHA-256 is computed,
+so it is hashed once and parsed from disk instead of from another in-memory
+buffer.  Spooled files are content addressed (``<digest>/<original name>``),
+so the same workbook uploaded again - by any session - reuses the file.
+
+For servers with many concurrent users, ``LNC_MEMORY_BOUNDED=1`` limits how
+many workbooks are parsed at the same time and parses them row by row.
+"""
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import sheet_cache
+
+SPOOL_DIR = os.environ.get("LNC_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "lnc_uploads"))
+# Larger uploads are rejected (run_dashboard.py passes the same limit to Streamlit)
+MAX_UPLOAD_MB = float(os.environ.get("LNC_MAX_UPLOAD_MB", "200"))
+# Spooled uploads not used for this long are removed
+SPOOL_TTL_SECONDS = float(os.environ.get("LNC_UPLOAD_TTL_HOURS", "24")) * 3600
+
+MEMORY_BOUNDED = os.environ.get("LNC_MEMORY_BOUNDED", "").lower() in ("1", "true", "yes")
+MAX_CONCURRENT_PARSES = int(os.environ.get("LNC_MAX_CONCURRENT_PARSES", "2"))
+
+# Shared by every session of the server process
+_parse_slots = threading.BoundedSemaphore(MAX_CONCURRENT_PARSES)
+
+
+class UploadTooLarge(ValueError):
+    """The upload is bigger than MAX_UPLOAD_MB"""
+
+
+def spool(uploaded, max_mb=None):
+    """Copy an uploaded file to the spool directory.
+
+    Returns ``(path, digest)``.  The file is read in chunks and hashed on the
+    way; an upload over ``max_mb`` raises UploadTooLarge.
+    """
+    max_mb = MAX_UPLOAD_MB if max_mb is None else max_mb
+    name = os.path.basename(getattr(uploaded, 'name', None) or "upload.xlsx")
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    _remove_expired()
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=SPOOL_DIR, suffix=".tmp")
+    try:
+        uploaded.seek(0)
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: uploaded.read(sheet_cache.CHUNK_SIZE), b''):
+                size += len(chunk)
+                if size > max_mb * 1024 * 1024:
+                    raise UploadTooLarge(f"{name} is larger than the {max_mb:g} MB upload limit")
+                digest.update(chunk)
+                f.write(chunk)
+        uploaded.seek(0)
+
+        entry_dir = os.path.join(SPOOL_DIR, digest.hexdigest())
+        path = os.path.join(entry_dir, name)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            # Mark as recently used so it isn't expired
+            os.utime(entry_dir)
+        else:
+            os.makedirs(entry_dir, exist_ok=True)
+            os.replace(tmp_path, path)
+        return path, digest.hexdigest()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove_expired():
+    now = time.time()
+    for entry in os.listdir(SPOOL_DIR):
+        entry_path = os.path.join(SPOOL_DIR, entry)
+        try:
+            if now - os.path.getmtime(entry_path) > SPOOL_TTL_SECONDS:
+                if os.path.isdir(entry_path):
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                else:
+                    os.remove(entry_path)
+        except OSError:
+            # Another session may have removed or replaced it
+            pass
+
+
+def parse_slot():
+    """Context manager around a workbook parse; waits for a free slot in memory-bounded mode"""
+    return _parse_slots if MEMORY_BOUNDED else contextlib.nullcontext()
+
+
+def streaming_mode():
+    """Reader mode for workbook parses: row by row in memory-bounded mode, else the default"""
+    return True if MEMORY_BOUNDED else None
@@ -0,0 +1,156 @@
+"""Single-pass workbook reading shared by the dashboard and read_excel_files.
+
+The workbook is opened once per call, so the zip container, shared-strings
+table and styles are parsed once no matter how many sheets are requested.
+The optional streaming mode walks rows with openpyxl's read-only
+``iter_rows`` and never materializes cell objects for the whole sheet.
+"""
+import os
+
+import pandas as pd
+
+import sheet_cache
+import type_inference
+
+# Default for callers that don't choose a mode explicitly
+STREAMING_DEFAULT = os.environ.get("LNC_STREAMING_READ", "0") == "1"
+
+
+def read_workbook(source, sheet_names=None, dtype=None, streaming=None):
+    """Read several sheets from one workbook in a single pass.
+
+    ``source`` is a file path or a binary file-like object.  ``sheet_names``
+    defaults to every sheet in the workbook.  Returns a dict of DataFrames
+    keyed by sheet name, in workbook order for ``sheet_names=None``.
+    """
+    if streaming is None:
+        streaming = STREAMING_DEFAULT
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    if streaming:
+        return _read_streaming(source, sheet_names, dtype)
+
+    with pd.ExcelFile(source, engine='openpyxl') as excel_file:
+        if sheet_names is None:
+            sheet_names = excel_file.sheet_names
+        return {name: excel_file.parse(name, dtype=dtype) for name in sheet_names}
+
+
+def list_sheets(source):
+    """Return a workbook's sheet names without parsing any sheet"""
+    import openpyxl
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    workbook = openpyxl.load_workbook(source, read_only=True, keep_links=False)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def load_sheets(source, digest, sheet_names, streaming=None, raw=None):
+    """Load type-converted sheets, preferring the on-disk Parquet cache.
+
+    Sheets missing from the cache are parsed together in a single pass,
+    converted with ``type_inference.convert_types`` and written back.
+    ``raw`` may hold sheets the caller already read with ``dtype=str``;
+    those are converted instead of parsed again.
+    """
+    raw = raw or {}
+    sheets = {}
+    for name in sheet_names:
+        df, metadata = sheet_cache.read_entry(digest, name)
+        if df is not None:
+            df.attrs['coercion_failures'] = metadata.get('coercion_failures', {})
+        sheets[name] = df
+    missing = [name for name, df in sheets.items() if df is None]
+    if missing:
+        unread = [name for name in missing if name not in raw]
+        parsed = read_workbook(source, unread, dtype=str, streaming=streaming) if unread else {}
+        parsed.update({name: raw[name] for name in missing if name in raw})
+        for name, df in parsed.items():
+            df, failures = type_inference.convert_types(df)
+            sheet_cache.write_sheet(digest, name, df, metadata={'coercion_failures': failures})
+            sheets[name] = df
+    return sheets
+
+
+def _read_streaming(source, sheet_names, dtype):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        if sheet_names is None:
+            sheet_names = workbook.sheetnames
+        sheets = {}
+        for name in sheet_names:
+            if name not in workbook.sheetnames:
+                raise ValueError(f"Worksheet named '{name}' not found")
+            rows = workbook[name].iter_rows(values_only=True)
+            sheets[name] = _rows_to_frame(rows, dtype)
+        return sheets
+    finally:
+        # Read-only workbooks keep the archive open until closed
+        workbook.close()
+
+
+def _convert_cell(value):
+    # Match pandas: whole-number floats come back as ints, empty strings as missing
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value == "":
+        return None
+    return value
+
+
+def _rows_to_frame(rows, dtype):
+    """Build a DataFrame from raw row tuples with pandas' header conventions"""
+    data = []
+    width = 0
+    last_non_empty = 0
+    for row in rows:
+        row = [_convert_cell(value) for value in row]
+        # Trim trailing empty cells, as pandas does for each row
+        while row and row[-1] is None:
+            row.pop()
+        data.append(row)
+        if row:
+            width = max(width, len(row))
+            last_non_empty = len(data)
+    # Drop trailing empty rows but keep blank rows inside the data
+    data = data[:last_non_empty]
+    if not data:
+        return pd.DataFrame()
+
+    header = data[0] + [None] * (width - len(data[0]))
+    body = [row + [None] * (width - len(row)) for row in data[1:]]
+    df = pd.DataFrame(body, columns=_column_names(header), dtype=object)
+
+    if dtype is str:
+        df = df.astype(str).mask(df.isna())
+    elif dtype is not None:
+        df = df.astype(dtype)
+    else:
+        df = df.infer_objects()
+    return df
+
+
+def _column_names(header):
+    """Name blank headers 'Unnamed: N' and suffix duplicates with '.1', '.2', ..."""
+    names = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            candidate = f"{name}.{seen[name]}"
+            while candidate in seen:
+                seen[name] += 1
+                candidate = f"{name}.{seen[name]}"
+            seen[candidate] = 0
+            name = candidate
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names